@@ -2,18 +2,17 @@
 # Copyright (C) 2022-2026 IMA LLC
 
 import adsk.core, adsk.fusion
-import os
-from urllib.parse import quote
 from ...lib import fusionAddInUtils as futil
 from ... import config
+from ..manifest import command_spec
 
 app = adsk.core.Application.get()
 ui = app.userInterface
 
-# Specify the command identity information.
+# Specify the command identity information. The button itself is created
+# from the matching row in commands/manifest.py.
 CMD_ID = "PTSHD_shareopeninteam"
-CMD_NAME = "Get Open in Team Link"
-CMD_Description = "Get a link on the clipboard for the active document that can be shared with your team to open the document for review in Fusion Team web client."
+CMD_NAME = command_spec(CMD_ID)["name"]
 
 # Specify that the command will be promoted to the panel.
 IS_PROMOTED = False
@@ -28,66 +27,16 @@ PANEL_NAME = config.my_panel_name
 PANEL_AFTER = config.my_panel_after
 
 
-# Resource location for command icons, here we assume a sub folder in this directory named "resources".
-ICON_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources", "")
-
 # Local list of event handlers used to maintain a reference so
 # they are not released and garbage collected.
 local_handlers = []
 
 
-# Executed when add-in is run.
-def start():
-    # ******************************** Create Command Definition ********************************
-    cmd_def = ui.commandDefinitions.addButtonDefinition(
-        CMD_ID, CMD_NAME, CMD_Description, ICON_FOLDER
-    )
-
-    # Define an event handler for the command created event. It will be called when the button is clicked.
-    futil.add_handler(cmd_def.commandCreated, command_created)
-
-    # **************** Add a button into the UI so the user can run the command. ****************
-    # Get the target workspace the button will be created in.
-
-    qat = ui.toolbars.itemById("QATRight")
-
-    if qat.controls.itemById("shareDropMenu") is None:
-        dropDown = qat.controls.addDropDown(
-            "Share Menu", ICON_FOLDER, "shareDropMenu", "FeaturePacksCommand", True
-        )
-    else:
-        dropDown = qat.controls.itemById("shareDropMenu")
-
-    # Add a button to toggle the visibility to the end of the panel.
-    control = dropDown.controls.addCommand(cmd_def, "", False)
-    # control.isPromoted = True
-
-
-# Executed when add-in is stopped.
-def stop():
-    # Get the various UI elements for this command
-    qat = ui.toolbars.itemById("QATRight")
-    command_control = qat.controls.itemById(CMD_ID)
-    command_definition = ui.commandDefinitions.itemById(CMD_ID)
-    dropDown = qat.controls.itemById("shareMenu")
-
-    # Delete the button command control
-    if command_control:
-        command_control.deleteMe()
-
-    if dropDown:
-        dropDown.deleteMe()
-
-    # Delete the command definition
-    if command_definition:
-        command_definition.deleteMe()
-
-
 # Function that is called when a user clicks the corresponding button in the UI.
 # This defines the contents of the command dialog and connects to the command related events.
 def command_created(args: adsk.core.CommandCreatedEventArgs):
     # General logging for debug.
-    futil.log(f"{CMD_NAME} Command Created Event")
+    futil.log_lazy("%s Command Created Event", CMD_NAME)
 
     # https://help.autodesk.com/view/fusion360/ENU/?contextId=CommandInputs
     inputs = args.command.commandInputs
@@ -105,7 +54,7 @@ def command_created(args: adsk.core.CommandCreatedEventArgs):
 # is immediately called after the created event not command inputs were created for the dialog.
 def command_execute(args: adsk.core.CommandEventArgs):
     # General logging for debug.
-    futil.log(f"{CMD_NAME} Command Execute Event")
+    futil.log_lazy("%s Command Execute Event", CMD_NAME)
 
     if not futil.isSaved():
         return
@@ -116,11 +65,11 @@ def command_execute(args: adsk.core.CommandEventArgs):
         progressBar.showBusy("Generating Fusion Team Link"),
 
         # Generate the share link
-        shareLink = app.activeDocument.dataFile.fusionWebURL
+        shareLink = futil.team_link(app.activeDocument.dataFile)
 
         # output the URL to the text commands
-        futil.log(
-            f"{CMD_NAME} Open in Team Link: {shareLink} was added to the clipboard."
+        futil.log_lazy(
+            "%s Open in Team Link: %s was added to the clipboard.", CMD_NAME, shareLink
         )
 
         # Copy the shared link to the clipboard
@@ -129,13 +78,18 @@ def command_execute(args: adsk.core.CommandEventArgs):
         resultString = f"An <b>Open in Team</b> link for {app.activeDocument.name} was added to the clipboard."
 
         if app.activeProduct.productType == "DesignProductType":
-            rootComp = app.activeProduct.rootComponent
-
-            if has_external_child_reference(rootComp):
-                futil.log(f"{CMD_NAME} Document has external references")
+            hasReferences = futil.document_has_external_references(
+                app.activeDocument, CMD_NAME
+            )
+
+            if hasReferences is futil.SCAN_UNKNOWN:
+                futil.log_lazy("%s External reference scan still running", CMD_NAME)
+                resultString += f"<br><br>Note:<br>This design is still being checked for external references. Run the command again to see if referenced designs may be shared."
+            elif hasReferences:
+                futil.log_lazy("%s Document has external references", CMD_NAME)
                 resultString += f"<br><br>Note:<br>This design has external references. Sharing this design will may share the referenced designs depending on the team member's permissions."
             else:
-                futil.log(f"{CMD_NAME} Document has no external references")
+                futil.log_lazy("%s Document has no external references", CMD_NAME)
 
         # Hide the progress bar
         progressBar.hide()
@@ -153,20 +107,10 @@ def command_execute(args: adsk.core.CommandEventArgs):
         futil.handle_error(CMD_NAME)
 
 
-def has_external_child_reference(component: adsk.fusion.Component) -> bool:
-    for occurrence in component.occurrences:
-        if occurrence.isReferencedComponent:
-            return True
-        # Recursively check child components
-        if has_external_child_reference(occurrence.component):
-            return True
-    return False
-
-
 # This event handler is called when the command terminates.
 def command_destroy(args: adsk.core.CommandEventArgs):
     # General logging for debug.
-    futil.log(f"{CMD_NAME} Command Destroy Event")
+    futil.log_lazy("%s Command Destroy Event", CMD_NAME)
 
     global local_handlers
     local_handlers = []
@@ -2,35 +2,177 @@
 # Copyright (C) 2022-2026 IMA LLC
 
 # Here you define the commands that will be added to your add-in.
+# The commands themselves are listed in manifest.py.
 
-# Import the modules corresponding to the commands you created.
-# If you want to add an additional command, duplicate one of the existing directories and import it here.
-# You need to use aliases (import "entry" as "my_module") assuming you have the default module named "entry".
-from .shareDocument import entry as shareDocument
-from .shareSettings import entry as shareSettings
-from .OpenDesktop import entry as OpenDesktop
-from .OpenInTeam import entry as openInTeam
-from .projectInvite import entry as projectInvite
-from .projectMembers import entry as projectMembers
-
-# Fusion will automatically call the start() and stop() functions.
-commands = [
-    shareDocument,
-    shareSettings,
-    OpenDesktop,
-    openInTeam,
-    projectInvite,
-    projectMembers,
-]
+import importlib
+import os
+import sys
+import time
+
+import adsk.core
+
+from ..lib import fusionAddInUtils as futil
+from .. import config
+from .manifest import COMMANDS
+from .registrar import register_commands, replace_command, unregister_commands
+
+# {package: imported entry module}
+_loaded = {}
+
+
+# ── Command loading ───────────────────────────────────────────────────────────
+
+
+def load_command(package: str):
+    """Import (once) and return the entry module of the command in *package*."""
+    module = _loaded.get(package)
+    if module is None:
+        with futil.perf_timer("import entry", f"{package}.load"):
+            module = importlib.import_module(f".{package}.entry", __name__)
+        _loaded[package] = module
+        futil.log_lazy("%s: entry module loaded", package)
+    return module
+
+
+def _lazy_command_created(package: str):
+    def command_created(args: adsk.core.CommandCreatedEventArgs):
+        load_command(package).command_created(args)
+
+    return command_created
+
+
+def start_commands(lazy: bool = True):
+    """Register every manifest command; import entry modules now unless *lazy*."""
+    if lazy:
+        register_commands(_lazy_command_created)
+        return
+    for spec in COMMANDS:
+        load_command(spec["package"])
+    register_commands(lambda package: _loaded[package].command_created)
+
+
+def stop_commands():
+    """Remove every command registered by start_commands()."""
+    unregister_commands()
+    _loaded.clear()
+
+
+def reload_command(package: str) -> float:
+    """Reload commands/<package>/entry.py and re-create only its button.
+
+    For development: edit the entry module, then call this from the Text
+    Commands window (Python mode) instead of restarting the add-in. Handlers
+    of a running instance of the command are dropped. Returns the
+    milliseconds the reload took.
+    """
+    spec = next((spec for spec in COMMANDS if spec["package"] == package), None)
+    if spec is None:
+        raise ValueError(f"Unknown command package: {package}")
+
+    t0 = time.perf_counter()
+    module = _loaded.pop(package, None) or sys.modules.get(
+        f"{__name__}.{package}.entry"
+    )
+    if module is not None:
+        getattr(module, "local_handlers", []).clear()
+        with futil.perf_timer("reload entry", f"{package}.load"):
+            _loaded[package] = importlib.reload(module)
+
+    if config.LAZY_COMMANDS:
+        callback = _lazy_command_created(package)
+    else:
+        callback = load_command(package).command_created
+    replace_command(spec, callback)
+
+    elapsed = (time.perf_counter() - t0) * 1000.0
+    futil.log(f"{package}: reloaded in {elapsed:.1f} ms", force_console=True)
+    return elapsed
+
+
+def benchmark_startup(iterations: int = 5) -> dict:
+    """Time start_commands() eagerly and lazily, importing entry modules afresh.
+
+    Run from the Text Commands window (Python mode) while the add-in is
+    running; its buttons are recreated afterwards. Returns
+    {"eager"|"lazy": {"mean_ms", "median_ms", "max_ms"}}.
+    """
+    stop_commands()
+    results = {}
+    for mode, lazy in (("eager", False), ("lazy", True)):
+        samples = []
+        for _ in range(iterations):
+            for package in [spec["package"] for spec in COMMANDS]:
+                sys.modules.pop(f"{__name__}.{package}.entry", None)
+            t0 = time.perf_counter()
+            start_commands(lazy)
+            samples.append((time.perf_counter() - t0) * 1000.0)
+            stop_commands()
+        samples.sort()
+        results[mode] = {
+            "mean_ms": round(sum(samples) / len(samples), 3),
+            "median_ms": round(samples[len(samples) // 2], 3),
+            "max_ms": round(samples[-1], 3),
+        }
+    start_commands(config.LAZY_COMMANDS)
+    futil.log(f"Command start-up benchmark: {results}", force_console=True)
+    return results
 
 
 # The start function will be run when the add-in is started.
 def start():
-    for command in commands:
-        command.start()
+    # Share caches and the logger with the other PowerTools add-ins.
+    if config.SHARED_RUNTIME:
+        futil.attach_runtime(config.ADDIN_NAME)
+    # Write debug logging from a background thread instead of the UI thread.
+    if config.DEBUG:
+        futil.start_buffered_logging(config.ADDIN_NAME)
+    # Sample the UI thread's stack when a handler stalls it.
+    if config.STALL_WATCHDOG:
+        futil.start_stall_watchdog()
+    # Worker pool whose completion callbacks run back on the UI thread.
+    futil.start_executor(config.EXECUTOR_WORKERS)
+
+    start_commands(config.LAZY_COMMANDS)
+
+    # Drop cached external-reference answers when documents are saved or closed.
+    futil.start_reference_index()
+    # Keep the persisted project reference graph current as documents are opened and saved.
+    futil.start_reference_graph()
+    # Revalidate share states served from the cache once each command finishes.
+    futil.start_share_state_cache()
+    # Custom events that let Get a Share Link finish after its command returns.
+    futil.start_share_jobs()
+    # Warm share data for each document as it becomes active.
+    if config.PREFETCH_ON_ACTIVATE:
+        futil.start_prefetch()
 
 
 # The stop function will be run when the add-in is stopped.
 def stop():
-    for command in commands:
-        command.stop()
+    stop_commands()
+
+    futil.stop_reference_index()
+    futil.stop_reference_graph()
+    futil.stop_share_state_cache()
+    futil.stop_share_jobs()
+    # Only stop what start() started, so stopping imports no extra submodules.
+    if config.PREFETCH_ON_ACTIVATE:
+        futil.stop_prefetch()
+        futil.stop_coalescing()
+    # Detach before clearing so the other add-ins keep the shared entries.
+    if config.SHARED_RUNTIME:
+        futil.detach_runtime()
+    futil.clear_link_caches()
+    futil.stop_executor()
+    # Keep the session's latency percentiles and span trace for comparison across runs.
+    if futil.PERF_TRACE:
+        logDirectory = futil.default_log_directory()
+        futil.dump_histograms(os.path.join(logDirectory, f"{config.ADDIN_NAME}.perf.csv"))
+        futil.write_chrome_trace(
+            os.path.join(logDirectory, f"{config.ADDIN_NAME}.trace.json")
+        )
+    if config.STALL_WATCHDOG:
+        futil.stop_stall_watchdog()
+    # Flush the remaining log records last so stop-time messages are kept.
+    if config.DEBUG:
+        futil.stop_buffered_logging()
@@ -0,0 +1,140 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2022-2026 IMA LLC
+
+import adsk.core, adsk.fusion
+from ...lib import fusionAddInUtils as futil
+from ... import config
+from ..manifest import command_spec
+
+app = adsk.core.Application.get()
+ui = app.userInterface
+
+# Specify the command identity information. The button itself is created
+# from the matching row in commands/manifest.py.
+CMD_ID = "PTSHD_exportlinks"
+CMD_NAME = command_spec(CMD_ID)["name"]
+
+# Specify that the command will be promoted to the panel.
+IS_PROMOTED = False
+
+# Global variables by referencing values from /config.py
+WORKSPACE_ID = config.design_workspace
+TAB_ID = config.tools_tab_id
+TAB_NAME = config.my_tab_name
+
+PANEL_ID = config.my_panel_id
+PANEL_NAME = config.my_panel_name
+PANEL_AFTER = config.my_panel_after
+
+
+# Local list of event handlers used to maintain a reference so
+# they are not released and garbage collected.
+local_handlers = []
+
+
+# Function that is called when a user clicks the corresponding button in the UI.
+# This defines the contents of the command dialog and connects to the command related events.
+def command_created(args: adsk.core.CommandCreatedEventArgs):
+    # General logging for debug.
+    futil.log_lazy("%s Command Created Event", CMD_NAME)
+
+    # https://help.autodesk.com/view/fusion360/ENU/?contextId=CommandInputs
+    inputs = args.command.commandInputs
+
+    # Connect to the events that are needed by this command.
+    futil.add_handler(
+        args.command.execute, command_execute, local_handlers=local_handlers
+    )
+    futil.add_handler(
+        args.command.destroy, command_destroy, local_handlers=local_handlers
+    )
+
+
+# This event handler is called when the user clicks the OK button in the command dialog or
+# is immediately called after the created event not command inputs were created for the dialog.
+def command_execute(args: adsk.core.CommandEventArgs):
+    # General logging for debug.
+    futil.log_lazy("%s Command Execute Event", CMD_NAME)
+
+    folder = app.data.activeFolder
+    if folder is None:
+        ui.messageBox(
+            "Select a folder in the Data Panel before running this command.",
+            "Export Folder Links",
+            0,
+            2,
+        )
+        return
+
+    try:
+        # Offer to resume an interrupted export of this folder tree.
+        resume = False
+        checkpoint = futil.read_batch_checkpoint(
+            folder, futil.LINK_EXPORT_CHECKPOINT_PREFIX
+        )
+        if checkpoint is not None:
+            answer = ui.messageBox(
+                f"A previous export of <b>{folder.name}</b> did not finish "
+                f"({checkpoint.get('files', 0)} documents done).<br><br>"
+                f"Resume it and append to {checkpoint['outputPath']}?",
+                "Export Folder Links",
+                adsk.core.MessageBoxButtonTypes.YesNoButtonType,
+                adsk.core.MessageBoxIconTypes.QuestionIconType,
+            )
+            resume = answer == adsk.core.DialogResults.DialogYes
+
+        if resume:
+            outputPath = checkpoint["outputPath"]
+        else:
+            fileDialog = ui.createFileDialog()
+            fileDialog.title = "Save Folder Links"
+            fileDialog.filter = "CSV (*.csv);;JSON Lines (*.jsonl)"
+            fileDialog.initialFilename = f"{folder.name} links.csv"
+            if fileDialog.showSave() != adsk.core.DialogResults.DialogOK:
+                return
+            outputPath = fileDialog.filename
+
+        progress = ui.createProgressDialog()
+        progress.isCancelButtonShown = True
+        progress.show("Export Folder Links", "Exporting links...", 0, 0)
+
+        try:
+            summary = futil.export_folder_links(
+                folder,
+                outputPath,
+                resume=resume,
+                progress=progress,
+                cmd_name=CMD_NAME,
+            )
+        except ValueError as e:
+            futil.clear_batch_checkpoint(folder, futil.LINK_EXPORT_CHECKPOINT_PREFIX)
+            ui.messageBox(
+                f"{e}<br><br>Run the command again to start a new export.",
+                "Export Folder Links",
+                0,
+                2,
+            )
+            return
+        finally:
+            progress.hide()
+
+        if summary["cancelled"]:
+            resultString = "<b>Export was cancelled.</b> Run the command again on this folder to resume.<br><br>"
+        else:
+            resultString = f"<b>Finished exporting {folder.name}.</b><br><br>"
+        resultString += f"Links for {summary['files']} documents were saved to {outputPath}"
+
+        ui.messageBox(resultString, "Export Folder Links", 0, 2)
+
+    except:
+        # Write the error message to the TEXT COMMANDS window.
+        futil.handle_error(CMD_NAME)
+
+
+# This event handler is called when the command terminates.
+def command_destroy(args: adsk.core.CommandEventArgs):
+    # General logging for debug.
+    futil.log_lazy("%s Command Destroy Event", CMD_NAME)
+
+    global local_handlers
+    local_handlers = []
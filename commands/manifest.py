@@ -0,0 +1,101 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2022-2026 IMA LLC
+
+"""Declarative description of the Share Menu and the commands in it.
+
+commands/__init__.py hands this table to the registrar, which creates the
+drop-down and every button in one pass and removes them again in reverse
+order. Entry modules take their display name from here too, so a command's
+identity is defined once. To add a command, duplicate one of the existing
+command folders and add a row to COMMANDS.
+
+This module is plain data and does not import adsk.
+"""
+
+# The drop-down in the right Quick Access Toolbar that holds every command.
+# Its icon comes from the resources folder of `iconPackage`.
+SHARE_MENU = {
+    "toolbarId": "QATRight",
+    "id": "shareDropMenu",
+    "name": "Share Menu",
+    "iconPackage": "shareDocument",
+    "positionId": "FeaturePacksCommand",
+    "isBefore": True,
+}
+
+# One row per command, in registration order. "package" is the command's
+# folder under commands/; "positionId"/"isBefore" place the button relative
+# to another command in the drop-down ("" appends it).
+COMMANDS = [
+    {
+        "package": "shareDocument",
+        "id": "PTSHD_sharedocument",
+        "name": "Get a Share Link",
+        "description": "Share active Document and copy the link to the clipboard.",
+        "positionId": "",
+        "isBefore": False,
+    },
+    {
+        "package": "shareFolder",
+        "id": "PTSHD_sharefolder",
+        "name": "Share Folder Links...",
+        "description": "Share every document in the active Data Panel folder and save the share links to a CSV or JSON Lines file.",
+        "positionId": "PTSHD_sharedocument",
+        "isBefore": False,
+    },
+    {
+        "package": "shareSettings",
+        "id": "PTSHD_sharesettings",
+        "name": "Change Share Settings",
+        "description": "Manage the active document's share link settings. Settings control if the document can be downloaded and is password protected.",
+        "positionId": "PTSHD_projectInvite",
+        "isBefore": False,
+    },
+    {
+        "package": "OpenDesktop",
+        "id": "PTSHD_shareopenondesktop",
+        "name": "Get Open on Desktop Link",
+        "description": "Get a link on the clipboard for the active document that can be shared with your team to directly open the document for edit in their Fusion desktop client.",
+        "positionId": "",
+        "isBefore": False,
+    },
+    {
+        "package": "OpenInTeam",
+        "id": "PTSHD_shareopeninteam",
+        "name": "Get Open in Team Link",
+        "description": "Get a link on the clipboard for the active document that can be shared with your team to open the document for review in Fusion Team web client.",
+        "positionId": "",
+        "isBefore": False,
+    },
+    {
+        "package": "exportLinks",
+        "id": "PTSHD_exportlinks",
+        "name": "Export Folder Links...",
+        "description": "Save Open on Desktop and Open in Team links for every document in the active Data Panel folder and its subfolders to a CSV or JSON Lines file. No documents are opened.",
+        "positionId": "PTSHD_shareopeninteam",
+        "isBefore": False,
+    },
+    {
+        "package": "projectInvite",
+        "id": "PTSHD_projectInvite",
+        "name": "Invite to Project...",
+        "description": "Invite members to the active document's project.\n\nThis will open your default WEB browser to invite to the hub and project for the active document.\n\nThis command is only available when the active document is saved and in a project.\n\nNote: This command will not work if the active document is not saved or is not in a project.",
+        "positionId": "PTSHD_sharesettings",
+        "isBefore": True,
+    },
+    {
+        "package": "projectMembers",
+        "id": "PTSHD_projectMembers",
+        "name": "Document Project Members...",
+        "description": "Invite members to the active document's project.\n\nThis will open your default WEB browser to invite to the hub and project for the active document.\n\nThis command is only available when the active document is saved and in a project.\n\nNote: This command will not work if the active document is not saved or is not in a project.",
+        "positionId": "PTSHD_sharesettings",
+        "isBefore": True,
+    },
+]
+
+_COMMANDS_BY_ID = {spec["id"]: spec for spec in COMMANDS}
+
+
+def command_spec(cmd_id: str) -> dict:
+    """Return the COMMANDS row for *cmd_id*."""
+    return _COMMANDS_BY_ID[cmd_id]
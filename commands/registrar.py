@@ -0,0 +1,156 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2022-2026 IMA LLC
+
+"""Creates and removes the Share Menu and its buttons from commands/manifest.py.
+
+`register_commands()` looks up the toolbar and the drop-down once and adds
+every command in a single pass; `unregister_commands()` removes exactly what
+was added, in reverse order, and deletes the drop-down once it is empty.
+The time each command takes to register and unregister is kept for
+`command_timings()`. `replace_command()` re-creates a single button in
+place for hot reloading.
+"""
+
+import os
+import time
+from typing import Callable
+
+import adsk.core
+
+from ..lib import fusionAddInUtils as futil
+from .manifest import COMMANDS, SHARE_MENU
+
+app = adsk.core.Application.get()
+ui = app.userInterface
+
+# Handlers for the buttons' commandCreated events.
+local_handlers = []
+
+# Command ids registered by the last register_commands() call, in order.
+_registered = []
+
+# {cmd_id: commandCreated handler in local_handlers}
+_command_handlers = {}
+
+# {cmd_id: {"package", "start_ms", "stop_ms"}}
+_timings = {}
+
+
+def icon_folder(package: str) -> str:
+    """Return the resources folder of the command in *package*."""
+    return os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), package, "resources", ""
+    )
+
+
+def _share_menu(create: bool):
+    toolbar = ui.toolbars.itemById(SHARE_MENU["toolbarId"])
+    if toolbar is None:
+        return None
+    dropDown = toolbar.controls.itemById(SHARE_MENU["id"])
+    if dropDown is None and create:
+        dropDown = toolbar.controls.addDropDown(
+            SHARE_MENU["name"],
+            icon_folder(SHARE_MENU["iconPackage"]),
+            SHARE_MENU["id"],
+            SHARE_MENU["positionId"],
+            SHARE_MENU["isBefore"],
+        )
+    return dropDown
+
+
+def register_commands(command_created: Callable[[str], Callable]) -> None:
+    """Create the Share Menu and one button per COMMANDS row.
+
+    `command_created(package)` returns the commandCreated callback for that
+    command. Anything left over from an earlier run is removed first.
+    """
+    unregister_commands()
+    dropDown = _share_menu(create=True)
+    for spec in COMMANDS:
+        t0 = time.perf_counter()
+        _add_command(
+            dropDown,
+            spec,
+            command_created(spec["package"]),
+            spec["positionId"],
+            spec["isBefore"],
+        )
+        _registered.append(spec["id"])
+        _timings[spec["id"]] = {
+            "package": spec["package"],
+            "start_ms": round((time.perf_counter() - t0) * 1000.0, 3),
+            "stop_ms": None,
+        }
+    futil.log_lazy("Registered commands: %s", command_timings)
+
+
+def unregister_commands() -> None:
+    """Remove the buttons, command definitions and (if empty) the Share Menu."""
+    dropDown = _share_menu(create=False)
+    for cmd_id in [spec["id"] for spec in reversed(COMMANDS)]:
+        t0 = time.perf_counter()
+        _remove_command(dropDown, cmd_id)
+        if cmd_id in _registered:
+            _timings[cmd_id]["stop_ms"] = round((time.perf_counter() - t0) * 1000.0, 3)
+    if dropDown and dropDown.controls.count == 0:
+        dropDown.deleteMe()
+
+    if _registered:
+        futil.log_lazy("Unregistered commands: %s", command_timings)
+    _registered.clear()
+    _command_handlers.clear()
+    local_handlers.clear()
+
+
+def _add_command(
+    dropDown, spec: dict, callback: Callable, positionId: str, isBefore: bool
+):
+    cmd_def = ui.commandDefinitions.addButtonDefinition(
+        spec["id"], spec["name"], spec["description"], icon_folder(spec["package"])
+    )
+    _command_handlers[spec["id"]] = futil.add_handler(
+        cmd_def.commandCreated,
+        callback,
+        name=f"{spec['package']}.command_created",
+        local_handlers=local_handlers,
+    )
+    dropDown.controls.addCommand(cmd_def, positionId, isBefore)
+
+
+def _remove_command(dropDown, cmd_id: str):
+    if dropDown:
+        control = dropDown.controls.itemById(cmd_id)
+        if control:
+            control.deleteMe()
+    command_definition = ui.commandDefinitions.itemById(cmd_id)
+    if command_definition:
+        command_definition.deleteMe()
+    handler = _command_handlers.pop(cmd_id, None)
+    if handler in local_handlers:
+        local_handlers.remove(handler)
+
+
+def replace_command(spec: dict, callback: Callable) -> None:
+    """Re-create the button of one COMMANDS row with a new commandCreated callback.
+
+    The button keeps its current place in the drop-down; the other buttons
+    are not touched.
+    """
+    dropDown = _share_menu(create=True)
+    positionId, isBefore = spec["positionId"], spec["isBefore"]
+    controls = dropDown.controls
+    ids = [controls.item(i).id for i in range(controls.count)]
+    if spec["id"] in ids:
+        index = ids.index(spec["id"])
+        if index + 1 < len(ids):
+            positionId, isBefore = ids[index + 1], True
+        elif index > 0:
+            positionId, isBefore = ids[index - 1], False
+    _remove_command(dropDown, spec["id"])
+    _add_command(dropDown, spec, callback, positionId, isBefore)
+
+
+def command_timings() -> list[dict]:
+    """Return {"id", "package", "start_ms", "stop_ms"} per registered command."""
+    return [{"id": cmd_id, **timing} for cmd_id, timing in _timings.items()]
@@ -2,17 +2,17 @@
 # Copyright (C) 2022-2026 IMA LLC
 
 import adsk.core, adsk.fusion
-import os
 from ...lib import fusionAddInUtils as futil
 from ... import config
+from ..manifest import command_spec
 
 app = adsk.core.Application.get()
 ui = app.userInterface
 
-# Specify the command identity information.
+# Specify the command identity information. The button itself is created
+# from the matching row in commands/manifest.py.
 CMD_ID = "PTSHD_sharedocument"
-CMD_NAME = "Get a Share Link"
-CMD_Description = "Share active Document and copy the link to the clipboard."
+CMD_NAME = command_spec(CMD_ID)["name"]
 
 # Specify that the command will be promoted to the panel.
 IS_PROMOTED = False
@@ -26,66 +26,16 @@ PANEL_ID = config.my_panel_id
 PANEL_NAME = config.my_panel_name
 PANEL_AFTER = config.my_panel_after
 
-# Resource location for command icons, here we assume a sub folder in this directory named "resources".
-ICON_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources", "")
-
 # Local list of event handlers used to maintain a reference so
 # they are not released and garbage collected.
 local_handlers = []
 
 
-# Executed when add-in is run.
-def start():
-    # ******************************** Create Command Definition ********************************
-    cmd_def = ui.commandDefinitions.addButtonDefinition(
-        CMD_ID, CMD_NAME, CMD_Description, ICON_FOLDER
-    )
-
-    # Define an event handler for the command created event. It will be called when the button is clicked.
-    futil.add_handler(cmd_def.commandCreated, command_created)
-
-    # **************** Add a button into the UI so the user can run the command. ****************
-    # Get the target workspace the button will be created in.
-
-    qat = ui.toolbars.itemById("QATRight")
-
-    if qat.controls.itemById("shareDropMenu") is None:
-        dropDown = qat.controls.addDropDown(
-            "Share Menu", ICON_FOLDER, "shareDropMenu", "FeaturePacksCommand", True
-        )
-    else:
-        dropDown = qat.controls.itemById("shareDropMenu")
-
-    # Add a button to toggle the visibility to the end of the panel.
-    control = dropDown.controls.addCommand(cmd_def, "", False)
-    # control.isPromoted = True
-
-
-# Executed when add-in is stopped.
-def stop():
-    # Get the various UI elements for this command
-    qat = ui.toolbars.itemById("QATRight")
-    command_control = qat.controls.itemById(CMD_ID)
-    command_definition = ui.commandDefinitions.itemById(CMD_ID)
-    dropDown = qat.controls.itemById("shareMenu")
-
-    # Delete the button command control
-    if command_control:
-        command_control.deleteMe()
-
-    if dropDown:
-        dropDown.deleteMe()
-
-    # Delete the command definition
-    if command_definition:
-        command_definition.deleteMe()
-
-
 # Function that is called when a user clicks the corresponding button in the UI.
 # This defines the contents of the command dialog and connects to the command related events.
 def command_created(args: adsk.core.CommandCreatedEventArgs):
     # General logging for debug.
-    futil.log(f"{CMD_NAME} Command Created Event")
+    futil.log_lazy("%s Command Created Event", CMD_NAME)
 
     # https://help.autodesk.com/view/fusion360/ENU/?contextId=CommandInputs
     inputs = args.command.commandInputs
@@ -103,7 +53,7 @@ def command_created(args: adsk.core.CommandCreatedEventArgs):
 # is immediately called after the created event not command inputs were created for the dialog.
 def command_execute(args: adsk.core.CommandEventArgs):
     # General logging for debug.
-    futil.log(f"{CMD_NAME} Command Execute Event")
+    futil.log_lazy("%s Command Execute Event", CMD_NAME)
 
     # ******************************** Your code here ********************************
 
@@ -125,85 +75,118 @@ def command_execute(args: adsk.core.CommandEventArgs):
         return
 
     try:
-        shareState = app.activeDocument.dataFile.sharedLink
+        with futil.perf_timer("command_execute", CMD_NAME):
+            dataFile = app.activeDocument.dataFile
+
+            # Serve an already shared document from the share state cache; the live
+            # state is re-read once the command has finished.
+            with futil.perf_timer("read share state", CMD_NAME):
+                shareState = futil.read_share_state_cache(dataFile)
+            if shareState and shareState["isShared"] and shareState["linkURL"]:
+                futil.log_lazy("%s Share state served from cache", CMD_NAME)
+                with futil.perf_timer("clipboard copy", CMD_NAME):
+                    futil.clipText(shareState["linkURL"])
+                show_share_result(app.activeDocument, shareState, True)
+                futil.schedule_share_state_revalidation(dataFile)
+                return
+
+            # creating a link can take a few seconds so show a busy bar while the
+            # share job runs when Fusion is next idle; the job still blocks the
+            # UI thread, as isShared can only be set there.
+            ui.progressBar.showBusy("Generating Share Link")
+            futil.start_share_job(app.activeDocument, share_job_complete, CMD_NAME)
 
-        # check share settings
-        if shareState.isShared == True:
-            wasShared = True
-        else:
-            wasShared = False
+    except:
+        # Write the error message to the TEXT COMMANDS window.
+        futil.handle_error(CMD_NAME)
 
-        # show a progress bar
-        progressBar = ui.progressBar
 
-        # Check if the document is shared
-        if shareState.isShared == False:
-            # creating a link can take a few seconds so show a busy bar
-            progressBar.showBusy("Generating Share Link"),
+# Called on the UI thread when the share job started by command_execute is done.
+# The link is already on the clipboard.
+def share_job_complete(document, shareState, wasShared: bool, error):
+    # Hide the progress bar
+    ui.progressBar.hide()
 
-            shareState.isShared = True  # Share the document
+    if document is None or error:
+        futil.log_lazy("%s Share job failed: %s", CMD_NAME, error)
+        ui.messageBox(
+            f"Failed to share the document.<br><br>{error or ''}",
+            "Share Document",
+            0,
+            2,
+        )
+        return
 
-        # Get the shared link
-        shareLink = shareState.linkURL
+    futil.log_lazy("%s Share job finished for %s", CMD_NAME, lambda: document.name)
+    app.log(f"link: {shareState['linkURL']} was added to clipboard")
+    with futil.perf_timer("share_job_complete", CMD_NAME):
+        show_share_result(document, shareState, wasShared)
 
-        if shareLink == "":
-            futil.log("Failed to get a link to the document")
-            ui.messageBox(
-                f"Failed to share the document.",
-                "Share Document",
-                1,
-                2,
-            )
-            exit(0)
 
-        # Copy the shared link to the clipboard
-        futil.clipText(shareLink)
+# Builds and shows the result message. The link must already be on the clipboard.
+def show_share_result(document, shareState: dict, wasShared: bool):
+    # Get the shared link
+    shareLink = shareState["linkURL"]
 
-        if wasShared == True:
-            resultString = f"Document is already shared <br>"
-        else:
-            resultString = f"<b>Document is now shared.</b> <br>"
+    if shareLink == "":
+        futil.log("Failed to get a link to the document")
+        ui.messageBox(
+            f"Failed to share the document.",
+            "Share Document",
+            1,
+            2,
+        )
+        return
 
-        resultString += f"A <b>Share link</b> for {app.activeDocument.name}: <a href=''{shareLink}''>{shareLink}</a> was added to the clipboard.<br><br>Note:"
+    if wasShared == True:
+        resultString = f"Document is already shared <br>"
+    else:
+        resultString = f"<b>Document is now shared.</b> <br>"
 
-        if shareState.isDownloadAllowed == False:
-            noDownload = True
-        else:
-            noDownload = False
+    resultString += f"A <b>Share link</b> for {document.name}: <a href=''{shareLink}''>{shareLink}</a> was added to the clipboard.<br><br>Note:"
 
-        if shareState.isPasswordRequired == True:
-            passwordProtected = True
-        else:
-            passwordProtected = False
+    if shareState["isDownloadAllowed"] == False:
+        noDownload = True
+    else:
+        noDownload = False
 
-        if noDownload == True:
-            resultString += "<br>Downloading from the link is not turned on. To enable downloading, go to <b>Share Settings</b><br>"
-        else:
-            resultString += (
-                "<br>Downloading the document from the share link is allowed.<br>"
-            )
+    if shareState["isPasswordRequired"] == True:
+        passwordProtected = True
+    else:
+        passwordProtected = False
 
-        if passwordProtected == True:
-            resultString += "<br>The share is password protected.<br>"
-        else:
-            resultString += f"<br>The share does not have a password. To set a password, go to <b>Share Settings</b><br>"
+    if noDownload == True:
+        resultString += "<br>Downloading from the link is not turned on. To enable downloading, go to <b>Share Settings</b><br>"
+    else:
+        resultString += (
+            "<br>Downloading the document from the share link is allowed.<br>"
+        )
 
-        if app.activeProduct.productType == "DesignProductType":
-            rootComp = app.activeProduct.rootComponent
+    if passwordProtected == True:
+        resultString += "<br>The share is password protected.<br>"
+    else:
+        resultString += f"<br>The share does not have a password. To set a password, go to <b>Share Settings</b><br>"
 
-            if has_external_child_reference(rootComp):
-                futil.log(f"{CMD_NAME} Document has external references")
-                if noDownload == True:
-                    resultString += f"<br>This design has external references. Sharing this design will allow the referenced designs to be viewed but not downloaded. <br>"
-                else:
-                    resultString += f"<br>This design has external references. Sharing this design will also share the referenced designs. To avoid sharing referenced designs, either save this design as a new document and break link or disable download.<br>"
-            else:
-                futil.log(f"{CMD_NAME} Document has no external references")
+    # Non-design documents report no references.
+    with futil.perf_timer("reference scan", CMD_NAME):
+        hasReferences = futil.document_has_external_references(document, CMD_NAME)
 
-        # Hide the progress bar
-        progressBar.hide()
+    if hasReferences is futil.SCAN_UNKNOWN:
+        futil.log_lazy("%s External reference scan still running", CMD_NAME)
+        resultString += f"<br>This design is still being checked for external references. Run the command again to see if sharing this design will also share referenced designs.<br>"
+    elif hasReferences:
+        futil.log_lazy("%s Document has external references", CMD_NAME)
+        if noDownload == True:
+            resultString += f"<br>This design has external references. Sharing this design will allow the referenced designs to be viewed but not downloaded. <br>"
+        else:
+            resultString += f"<br>This design has external references. Sharing this design will also share the referenced designs. To avoid sharing referenced designs, either save this design as a new document and break link or disable download.<br>"
+        with futil.perf_timer("exposed documents", CMD_NAME):
+            resultString += exposed_documents_note(document, noDownload)
+    else:
+        futil.log_lazy("%s Document has no external references", CMD_NAME)
 
-        # Display the message to the user
+    # Display the message to the user
+    with futil.perf_timer("message box", CMD_NAME):
         ui.messageBox(
             resultString,
             "Share Document",
@@ -211,25 +194,38 @@ def command_execute(args: adsk.core.CommandEventArgs):
             2,
         )
 
-    except:
-        # Write the error message to the TEXT COMMANDS window.
-        futil.handle_error(CMD_NAME)
 
+# Maximum number of exposed documents listed in the result message.
+MAX_EXPOSED_LISTED = 10
 
-def has_external_child_reference(component: adsk.fusion.Component) -> bool:
-    for occurrence in component.occurrences:
-        if occurrence.isReferencedComponent:
-            return True
-        # Recursively check child components
-        if has_external_child_reference(occurrence.component):
-            return True
-    return False
+
+def exposed_documents_note(document, noDownload: bool) -> str:
+    """Build the result-message list of documents exposed by sharing *document*."""
+    exposed, unindexed = futil.exposed_documents(document, CMD_NAME)
+    if not exposed:
+        return ""
+
+    futil.log_lazy(
+        "%s %s referenced documents exposed (%s not indexed)",
+        CMD_NAME,
+        len(exposed),
+        unindexed,
+    )
+    access = "viewable" if noDownload else "viewable and downloadable"
+    note = f"<br>Referenced designs that become {access}:<br>"
+    for child in exposed[:MAX_EXPOSED_LISTED]:
+        note += f"&nbsp;&nbsp;• {child['name']} (v{child['version']})<br>"
+    if len(exposed) > MAX_EXPOSED_LISTED:
+        note += f"&nbsp;&nbsp;…and {len(exposed) - MAX_EXPOSED_LISTED} more<br>"
+    if unindexed:
+        note += "Some referenced designs have not been opened since this add-in was installed, so designs they reference may be missing from this list.<br>"
+    return note
 
 
 # This event handler is called when the command terminates.
 def command_destroy(args: adsk.core.CommandEventArgs):
     # General logging for debug.
-    futil.log(f"{CMD_NAME} Command Destroy Event")
+    futil.log_lazy("%s Command Destroy Event", CMD_NAME)
 
     global local_handlers
     local_handlers = []
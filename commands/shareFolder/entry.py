@@ -0,0 +1,169 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2022-2026 IMA LLC
+
+import adsk.core, adsk.fusion
+from ...lib import fusionAddInUtils as futil
+from ... import config
+from ..manifest import command_spec
+
+app = adsk.core.Application.get()
+ui = app.userInterface
+
+# Specify the command identity information. The button itself is created
+# from the matching row in commands/manifest.py.
+CMD_ID = "PTSHD_sharefolder"
+CMD_NAME = command_spec(CMD_ID)["name"]
+
+# Specify that the command will be promoted to the panel.
+IS_PROMOTED = False
+
+# Global variables by referencing values from /config.py
+WORKSPACE_ID = config.design_workspace
+TAB_ID = config.tools_tab_id
+TAB_NAME = config.my_tab_name
+
+PANEL_ID = config.my_panel_id
+PANEL_NAME = config.my_panel_name
+PANEL_AFTER = config.my_panel_after
+
+# Command input ids
+INCLUDE_SUBFOLDERS_ID = "includeSubfolders"
+
+# Local list of event handlers used to maintain a reference so
+# they are not released and garbage collected.
+local_handlers = []
+
+
+# Function that is called when a user clicks the corresponding button in the UI.
+# This defines the contents of the command dialog and connects to the command related events.
+def command_created(args: adsk.core.CommandCreatedEventArgs):
+    # General logging for debug.
+    futil.log_lazy("%s Command Created Event", CMD_NAME)
+
+    # https://help.autodesk.com/view/fusion360/ENU/?contextId=CommandInputs
+    inputs = args.command.commandInputs
+
+    folder = app.data.activeFolder
+    folderName = folder.name if folder else "(no folder selected)"
+    inputs.addTextBoxCommandInput(
+        "folderName", "Folder", f"<b>{folderName}</b>", 1, True
+    )
+    inputs.addBoolValueInput(INCLUDE_SUBFOLDERS_ID, "Include subfolders", True, "", True)
+
+    # Connect to the events that are needed by this command.
+    futil.add_handler(
+        args.command.execute, command_execute, local_handlers=local_handlers
+    )
+    futil.add_handler(
+        args.command.destroy, command_destroy, local_handlers=local_handlers
+    )
+
+
+# This event handler is called when the user clicks the OK button in the command dialog.
+def command_execute(args: adsk.core.CommandEventArgs):
+    # General logging for debug.
+    futil.log_lazy("%s Command Execute Event", CMD_NAME)
+
+    # ******************************** Your code here ********************************
+
+    shareCmdDef = ui.commandDefinitions.itemById("SimpleSharingPublicLinkCommand")
+    isShareAllowed = shareCmdDef.controlDefinition.isEnabled
+
+    if not isShareAllowed:
+        ui.messageBox(
+            "Sharing is not allowed.\nPlease check if your Team Hub Administrator has disabled sharing",
+            "Share Folder",
+            0,
+            2,
+        )
+        return
+
+    folder = app.data.activeFolder
+    if folder is None:
+        ui.messageBox(
+            "Select a folder in the Data Panel before running this command.",
+            "Share Folder",
+            0,
+            2,
+        )
+        return
+
+    includeSubfolders = args.command.commandInputs.itemById(INCLUDE_SUBFOLDERS_ID).value
+
+    try:
+        # Offer to resume an interrupted run for this folder.
+        resume = False
+        checkpoint = futil.read_batch_checkpoint(folder)
+        if checkpoint is not None:
+            answer = ui.messageBox(
+                f"A previous run for <b>{folder.name}</b> did not finish "
+                f"({len(checkpoint.get('completed', []))} files done).<br><br>"
+                f"Resume it and append to {checkpoint['outputPath']}?",
+                "Share Folder",
+                adsk.core.MessageBoxButtonTypes.YesNoButtonType,
+                adsk.core.MessageBoxIconTypes.QuestionIconType,
+            )
+            resume = answer == adsk.core.DialogResults.DialogYes
+
+        if resume:
+            outputPath = checkpoint["outputPath"]
+            includeSubfolders = checkpoint.get("recursive", includeSubfolders)
+        else:
+            outputPath = choose_output_path(folder.name)
+            if not outputPath:
+                return
+
+        progress = ui.createProgressDialog()
+        progress.isCancelButtonShown = True
+        progress.show("Share Folder", "Sharing %v of %m documents", 0, 1)
+
+        try:
+            summary = futil.batch_share_folder(
+                folder,
+                outputPath,
+                recursive=includeSubfolders,
+                resume=resume,
+                progress=progress,
+                cmd_name=CMD_NAME,
+            )
+        finally:
+            progress.hide()
+
+        if summary["cancelled"]:
+            resultString = "<b>Sharing was cancelled.</b> Run the command again on this folder to resume.<br><br>"
+        else:
+            resultString = f"<b>Finished sharing {folder.name}.</b><br><br>"
+        resultString += (
+            f"Newly shared: {summary['shared']}<br>"
+            f"Already shared: {summary['alreadyShared']}<br>"
+            f"Failed: {summary['failed']}<br>"
+        )
+        if summary["skipped"]:
+            resultString += f"Done in a previous run: {summary['skipped']}<br>"
+        resultString += f"<br>Share links were saved to {outputPath}"
+
+        ui.messageBox(resultString, "Share Folder", 0, 2)
+
+    except:
+        # Write the error message to the TEXT COMMANDS window.
+        futil.handle_error(CMD_NAME)
+
+
+def choose_output_path(folderName: str) -> str:
+    """Ask for the result file. Returns an empty string if the user cancels."""
+    fileDialog = ui.createFileDialog()
+    fileDialog.title = "Save Share Links"
+    fileDialog.filter = "CSV (*.csv);;JSON Lines (*.jsonl)"
+    fileDialog.initialFilename = f"{folderName} share links.csv"
+    if fileDialog.showSave() != adsk.core.DialogResults.DialogOK:
+        return ""
+    return fileDialog.filename
+
+
+# This event handler is called when the command terminates.
+def command_destroy(args: adsk.core.CommandEventArgs):
+    # General logging for debug.
+    futil.log_lazy("%s Command Destroy Event", CMD_NAME)
+
+    global local_handlers
+    local_handlers = []
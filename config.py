@@ -8,11 +8,47 @@
 import os
 
 # Flag that indicates to run in Debug mode or not. When running in Debug mode
-# more information is written to the Text Command window. Generally, it's useful
+# more information is written to a JSON-lines log file in the temp folder, with a
+# periodic summary in the Text Command window. Generally, it's useful
 # to set this to True while developing an add-in and set it to False when you
 # are ready to distribute it.
 DEBUG = False
 
+# When True, futil.perf_timer() blocks print a [PERF] line and are recorded in
+# latency histograms and as nested trace spans; the p50/p95/p99 report and a
+# Chrome trace (about:tracing / Perfetto) are written next to the log file
+# when the add-in stops.
+PERF_TRACE = False
+
+# Opt-in handler profiling for slow-share reports. Every command handler call is
+# run under cProfile (PROFILE_HANDLERS) and/or tracemalloc (PROFILE_MEMORY) and
+# the results are written to cache/profiles/ for the user to send in.
+PROFILE_HANDLERS = False
+PROFILE_MEMORY = False
+
+# When True, a watchdog thread samples the UI thread's stack whenever an event
+# handler runs longer than half a second and writes flame-graph stacks and the
+# stalled command to cache/stalls/.
+STALL_WATCHDOG = False
+
+# When True, share state, hub URL and the external-reference scan are warmed
+# in idle time whenever a document is activated or opened, so the Share Menu
+# commands find the work already done.
+PREFETCH_ON_ACTIVATE = True
+
+# When True, only the Share Menu buttons are created at start-up; each
+# command's module is imported the first time its button is clicked.
+LAZY_COMMANDS = True
+
+# When True, this add-in joins the runtime shared by all PowerTools add-ins in
+# the Fusion process: hub URL and Global Parameters folder lookups and the
+# debug logger are shared instead of being kept once per add-in.
+SHARED_RUNTIME = False
+
+# Worker threads for pure-Python background work (clipboard copies, cache
+# encoding, export formatting). Fusion API calls never run on them.
+EXECUTOR_WORKERS = 2
+
 ADDIN_NAME = os.path.basename(os.path.dirname(__file__))
 COMPANY_NAME = "Autodesk"
 
@@ -4,10 +4,180 @@
 # This package is kept byte-for-byte in sync across all PowerTools add-ins so
 # each add-in exposes the same helper surface. general_utils must be imported
 # first: it defines `app`/`ui`, which attributes_utils imports from the package.
+#
+# Only general_utils (and the clipboard_utils/perf_utils it needs) is imported
+# eagerly. Every other submodule is imported the first time one of its names
+# is read from the package (`futil.add_handler`, `futil.share_utils`, ...).
+# commands.start() reads most of them, so for this add-in the saving is
+# limited to what its enabled features never touch: attributes_utils (and
+# adsk.cam), date_utils and upload_utils until a command uses them,
+# log_utils/runtime_utils/profile_utils/watchdog_utils unless DEBUG,
+# SHARED_RUNTIME, PROFILE_* or STALL_WATCHDOG is on, and the prefetch and
+# coalescing modules when PREFETCH_ON_ACTIVATE is off. When adding a public
+# name to a submodule, add it to _LAZY_SUBMODULES as well.
+import importlib
+import time
+
 from .general_utils import *
-from .event_utils import *
-from .attributes_utils import *
-from .cache_utils import *
-from .date_utils import *
-from .log_utils import *
-from .upload_utils import *
+
+# {submodule: public names it provides}, in the order the package used to
+# star-import them.
+_LAZY_SUBMODULES = {
+    "clipboard_utils": (
+        "ClipboardError", "ClipboardBackend", "MemoryClipboard", "CommandClipboard",
+        "LegacyShellClipboard", "WindowsClipboard", "MacClipboard",
+        "default_clipboard_backend", "get_clipboard_backend",
+        "set_clipboard_backend", "copy_text", "benchmark_clipboard",
+    ),
+    "perf_utils": (
+        "SUB_BUCKET_BITS", "MAX_TRACE_SPANS", "REPORT_FIELDS", "LatencyHistogram",
+        "record_latency", "latency_report", "dump_histograms", "reset_histograms",
+        "begin_span", "end_span", "chrome_trace_events", "write_chrome_trace",
+        "clear_trace",
+    ),
+    "watchdog_utils": (
+        "STALL_FOLDER", "DEFAULT_STALL_THRESHOLD_SECONDS",
+        "DEFAULT_SAMPLE_INTERVAL_SECONDS", "MAX_STACK_DEPTH", "StallWatchdog",
+        "begin_handler_watch", "end_handler_watch", "start_stall_watchdog",
+        "stop_stall_watchdog",
+    ),
+    "event_utils": (
+        "add_handler", "clear_handlers", "register_custom_event",
+        "unregister_custom_event", "benchmark_handler_creation",
+        "callback_label", "live_handler_counts", "find_leaked_handlers",
+        "dispatch_latency_report", "handler_report", "dump_handler_report",
+    ),
+    "coalesce_utils": (
+        "COALESCE_EVENT_ID", "DEBOUNCE", "THROTTLE",
+        "DEFAULT_COALESCE_WINDOW_SECONDS", "DEFAULT_MAX_WAIT_WINDOWS",
+        "add_coalesced_handler", "stop_coalescing",
+    ),
+    "executor_utils": (
+        "EXECUTOR_COMPLETE_EVENT_ID", "DEFAULT_MAX_WORKERS", "run_on_main_thread",
+        "submit", "start_executor", "stop_executor",
+    ),
+    "profile_utils": (
+        "PROFILE_FOLDER", "MAX_PROFILE_FILES", "TOP_ALLOCATIONS",
+        "TRACEMALLOC_FRAMES", "is_profiling_enabled", "is_profiled",
+        "profile_call",
+    ),
+    "attributes_utils": (
+        "attributes_for_selection", "get_all_attributes", "get_comptypes",
+        "update_feedback_from_list",
+    ),
+    "cache_utils": (
+        "GLOBAL_PARAMS_FOLDER_NAME", "CACHE_FOLDER", "project_cache_key",
+        "global_params_folder_cache_path", "param_docs_cache_path",
+        "param_set_sidecar_path", "read_global_params_folder_cache",
+        "write_global_params_folder_cache",
+        "resolve_global_params_folder_from_cache", "find_global_params_folder",
+        "read_param_docs_cache", "write_param_docs_cache",
+        "upsert_param_docs_cache_entry", "list_param_docs",
+        "write_param_set_sidecar", "read_param_set_sidecar", "get_active_project",
+        "safe_activate",
+    ),
+    "date_utils": (
+        "next_business_day", "compute_quick_dates",
+    ),
+    "runtime_utils": (
+        "RUNTIME_MODULE_NAME", "RUNTIME_VERSION", "SHARED_LOG_NAME", "SHARED_CACHES",
+        "attach_runtime", "detach_runtime", "shared_runtime", "runtime_info",
+    ),
+    "log_utils": (
+        "LOG_SUMMARY_EVENT_ID", "DEFAULT_LOG_CAPACITY",
+        "DEFAULT_FLUSH_INTERVAL_SECONDS", "DEFAULT_SUMMARY_INTERVAL_SECONDS",
+        "DEFAULT_LOG_MAX_BYTES", "DEFAULT_LOG_BACKUP_COUNT",
+        "default_log_directory", "open_live_log_viewer", "BufferedLogger",
+        "start_buffered_logging", "stop_buffered_logging",
+        "benchmark_disabled_logging",
+    ),
+    "upload_utils": (
+        "DEFAULT_UPLOAD_TIMEOUT_SECONDS", "DEFAULT_POLL_INTERVAL_SECONDS",
+        "DEFAULT_SETTLE_SECONDS", "DEFAULT_HEARTBEAT_SECONDS", "wait_for_upload",
+    ),
+    "reference_utils": (
+        "SCAN_UNKNOWN", "DEFAULT_SCAN_BUDGET_SECONDS", "DEFAULT_SCAN_CHUNK_SIZE",
+        "DEFAULT_PROGRESS_DELAY_SECONDS", "document_cache_key", "ReferenceScan",
+        "has_external_child_reference", "document_has_external_references",
+        "invalidate_reference_index", "start_reference_index",
+        "stop_reference_index",
+    ),
+    "reference_graph_utils": (
+        "GRAPH_FORMAT_VERSION", "reference_graph_cache_path", "record_document",
+        "forget_project_graph", "exposed_documents", "start_reference_graph",
+        "stop_reference_graph",
+    ),
+    "share_utils": (
+        "DEFAULT_BATCH_SIZE", "SHARE_STATE_REVALIDATE_EVENT_ID",
+        "SHARE_JOB_START_EVENT_ID", "SHARE_STATE_FIELDS", "SHARE_RESULT_FIELDS",
+        "iter_folder_data_files", "iter_folders", "count_folder_data_files",
+        "share_data_file", "share_state_cache_path", "read_live_share_state",
+        "read_share_state_cache", "write_share_state_cache",
+        "invalidate_share_state_cache", "find_open_document",
+        "schedule_share_state_revalidation", "start_share_state_cache",
+        "stop_share_state_cache", "start_share_job", "start_share_jobs",
+        "stop_share_jobs", "ShareResultWriter", "batch_checkpoint_path",
+        "read_batch_checkpoint", "write_batch_checkpoint", "clear_batch_checkpoint",
+        "batch_share_folder",
+    ),
+    "link_utils": (
+        "LINK_EXPORT_CHECKPOINT_PREFIX", "LINK_EXPORT_FIELDS", "hub_url_prefix",
+        "project_url_root", "hub_url_prefix_for_file", "project_url_root_for_file",
+        "clear_link_caches", "desktop_link", "team_link", "invite_link",
+        "members_link", "desktop_link_for_file", "invite_link_for_file",
+        "members_link_for_file", "export_folder_links",
+    ),
+    "prefetch_utils": (
+        "PREFETCH_EVENT_ID", "PREFETCH_SCAN_SLICE_SECONDS",
+        "PREFETCH_COALESCE_SECONDS", "prefetch_document", "queue_prefetch",
+        "start_prefetch", "stop_prefetch",
+    ),
+}
+
+_LAZY_NAMES = {
+    name: submodule for submodule, names in _LAZY_SUBMODULES.items() for name in names
+}
+
+# {submodule: seconds its first import took, including its own imports}
+_import_times = {}
+
+
+def _import_submodule(submodule: str):
+    module = globals().get(submodule)
+    if module is None or not hasattr(module, "__file__"):
+        t0 = time.perf_counter()
+        module = importlib.import_module(f".{submodule}", __name__)
+        _import_times.setdefault(submodule, time.perf_counter() - t0)
+    return module
+
+
+def __getattr__(name: str):
+    if name in _LAZY_SUBMODULES:
+        return _import_submodule(name)
+    submodule = _LAZY_NAMES.get(name)
+    if submodule is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(_import_submodule(submodule), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_NAMES) | set(_LAZY_SUBMODULES))
+
+
+def import_times() -> dict:
+    """Return {submodule: first-import seconds} for lazily imported submodules."""
+    return dict(_import_times)
+
+
+def import_all_submodules() -> float:
+    """Import every remaining submodule now. Returns the seconds it took.
+
+    Compare with `import_times()` after normal use to see what lazy loading
+    saves; run from the Text Commands window (Python mode).
+    """
+    t0 = time.perf_counter()
+    for submodule in _LAZY_SUBMODULES:
+        _import_submodule(submodule)
+    return time.perf_counter() - t0
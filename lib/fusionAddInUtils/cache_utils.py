@@ -28,6 +28,10 @@ _ADDIN_ROOT = os.path.dirname(
 )
 CACHE_FOLDER = os.path.join(_ADDIN_ROOT, "cache")
 
+# {project_key: gp_folder payload}; saves re-reading gp_folder_*.json and is
+# shared across add-ins when runtime_utils.attach_runtime() is used.
+_global_params_folders = {}
+
 
 # ── Key and path helpers ──────────────────────────────────────────────────────
 
@@ -63,6 +67,9 @@ def param_set_sidecar_path(data_file) -> str | None:
 
 def read_global_params_folder_cache(project, cmd_name: str) -> dict | None:
     """Read cached Global Parameters folder metadata for the given project."""
+    payload = _global_params_folders.get(project_cache_key(project))
+    if payload is not None and payload.get("projectName") == project.name:
+        return payload
     path = global_params_folder_cache_path(project)
     if not os.path.exists(path):
         return None
@@ -73,6 +80,7 @@ def read_global_params_folder_cache(project, cmd_name: str) -> dict | None:
             return None
         if not payload.get("folderId"):
             return None
+        _global_params_folders[project_cache_key(project)] = payload
         return payload
     except Exception:
         futil.log(f"{cmd_name}: failed to read folder cache — ignoring")
@@ -90,6 +98,7 @@ def write_global_params_folder_cache(project, folder, cmd_name: str) -> None:
         "folderId": folder_id,
         "folderName": folder.name,
     }
+    _global_params_folders[payload["projectKey"]] = payload
     try:
         os.makedirs(CACHE_FOLDER, exist_ok=True)
         with open(global_params_folder_cache_path(project), "w", encoding="utf-8") as fh:
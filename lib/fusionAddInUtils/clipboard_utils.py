@@ -0,0 +1,353 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2022-2026 IMA LLC
+
+"""Pluggable system clipboard backends.
+
+`copy_to_clipboard()` in general_utils used to start `clip.exe` through a
+shell or run `echo "..." | pbcopy` for every copy: tens of milliseconds of
+process start-up, broken by quotes in document names, and nothing at all on
+Linux. Copies now go through one backend object that is chosen on first use
+and kept for the session:
+
+  WindowsClipboard   user32 SetClipboardData(CF_UNICODETEXT) through ctypes
+  MacClipboard       NSPasteboard through the Objective-C runtime (ctypes)
+  CommandClipboard   argv-based helper, no shell — pbcopy, wl-copy, xclip, xsel
+  MemoryClipboard    in-process stand-in for tests and benchmarks
+
+This module does not import adsk, so backends can be exercised and timed
+outside Fusion:
+
+    python clipboard_utils.py 50
+"""
+
+import ctypes
+import ctypes.util
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+
+class ClipboardError(RuntimeError):
+    """Raised when a backend cannot place text on the clipboard."""
+
+
+# ── Backends ──────────────────────────────────────────────────────────────────
+
+
+class ClipboardBackend:
+    """Base class: `copy(text)` places *text* on the clipboard."""
+
+    name = "base"
+
+    def copy(self, text: str) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release anything the backend holds. Safe to call more than once."""
+
+
+class MemoryClipboard(ClipboardBackend):
+    """Keeps copies in memory. `text` is the last copy, `history` all of them."""
+
+    name = "memory"
+
+    def __init__(self):
+        self.text = None
+        self.history = []
+
+    def copy(self, text: str) -> None:
+        self.text = text
+        self.history.append(text)
+
+
+class CommandClipboard(ClipboardBackend):
+    """Pipes text to a helper command given as an argv list (no shell).
+
+    `prefix` is written before every text, e.g. a byte order mark.
+    """
+
+    def __init__(self, argv: list[str], encoding: str = "utf-8", prefix: str = ""):
+        self.argv = list(argv)
+        self.encoding = encoding
+        self.prefix = prefix
+        self.name = os.path.basename(self.argv[0])
+
+    def copy(self, text: str) -> None:
+        try:
+            subprocess.run(
+                self.argv,
+                input=(self.prefix + text).encode(self.encoding),
+                check=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=5,
+            )
+        except (OSError, subprocess.SubprocessError) as e:
+            raise ClipboardError(f"{self.name} failed: {e}") from e
+
+
+class LegacyShellClipboard(ClipboardBackend):
+    """The original process-per-copy implementation, kept for benchmarking."""
+
+    name = "legacy-shell"
+
+    def copy(self, text: str) -> None:
+        if os.name == "nt":
+            subprocess.run(["clip.exe"], input=text.encode("utf-8"), check=True, shell=True)
+        else:
+            os.system(f'echo "{text}" | pbcopy')
+
+
+class WindowsClipboard(ClipboardBackend):
+    """Native Win32 clipboard; no process is started."""
+
+    name = "win32"
+
+    CF_UNICODETEXT = 13
+    GMEM_MOVEABLE = 0x0002
+
+    def __init__(self):
+        from ctypes import wintypes
+
+        self._user32 = ctypes.WinDLL("user32", use_last_error=True)
+        self._kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+
+        self._user32.OpenClipboard.argtypes = [wintypes.HWND]
+        self._user32.OpenClipboard.restype = wintypes.BOOL
+        self._user32.EmptyClipboard.restype = wintypes.BOOL
+        self._user32.SetClipboardData.argtypes = [wintypes.UINT, wintypes.HANDLE]
+        self._user32.SetClipboardData.restype = wintypes.HANDLE
+        self._user32.CloseClipboard.restype = wintypes.BOOL
+        self._kernel32.GlobalAlloc.argtypes = [wintypes.UINT, ctypes.c_size_t]
+        self._kernel32.GlobalAlloc.restype = wintypes.HGLOBAL
+        self._kernel32.GlobalLock.argtypes = [wintypes.HGLOBAL]
+        self._kernel32.GlobalLock.restype = wintypes.LPVOID
+        self._kernel32.GlobalUnlock.argtypes = [wintypes.HGLOBAL]
+        self._kernel32.GlobalFree.argtypes = [wintypes.HGLOBAL]
+
+    def _open(self) -> None:
+        # Another process may briefly hold the clipboard; retry for ~100 ms.
+        for _ in range(10):
+            if self._user32.OpenClipboard(None):
+                return
+            time.sleep(0.01)
+        raise ClipboardError(f"OpenClipboard failed ({ctypes.get_last_error()})")
+
+    def copy(self, text: str) -> None:
+        data = text.encode("utf-16-le") + b"\x00\x00"
+        self._open()
+        try:
+            # Allocated only once the clipboard is open, so a failed open
+            # leaves nothing to free.
+            handle = self._kernel32.GlobalAlloc(self.GMEM_MOVEABLE, len(data))
+            if not handle:
+                raise ClipboardError("GlobalAlloc failed")
+            try:
+                pointer = self._kernel32.GlobalLock(handle)
+                if not pointer:
+                    raise ClipboardError("GlobalLock failed")
+                ctypes.memmove(pointer, data, len(data))
+                self._kernel32.GlobalUnlock(handle)
+
+                self._user32.EmptyClipboard()
+                if not self._user32.SetClipboardData(self.CF_UNICODETEXT, handle):
+                    raise ClipboardError(
+                        f"SetClipboardData failed ({ctypes.get_last_error()})"
+                    )
+            except BaseException:
+                self._kernel32.GlobalFree(handle)
+                raise
+            # On success the clipboard owns the memory.
+        finally:
+            self._user32.CloseClipboard()
+
+
+class MacClipboard(ClipboardBackend):
+    """NSPasteboard through the Objective-C runtime; no process is started.
+
+    Fusion already has AppKit loaded, so the only set-up cost is resolving a
+    handful of selectors once.
+    """
+
+    name = "nspasteboard"
+
+    def __init__(self):
+        objc_path = ctypes.util.find_library("objc")
+        appkit_path = ctypes.util.find_library("AppKit")
+        if not objc_path or not appkit_path:
+            raise ClipboardError("Objective-C runtime or AppKit not found")
+        self._objc = ctypes.cdll.LoadLibrary(objc_path)
+        self._appkit = ctypes.cdll.LoadLibrary(appkit_path)
+
+        self._objc.objc_getClass.restype = ctypes.c_void_p
+        self._objc.objc_getClass.argtypes = [ctypes.c_char_p]
+        self._objc.sel_registerName.restype = ctypes.c_void_p
+        self._objc.sel_registerName.argtypes = [ctypes.c_char_p]
+
+        self._pasteboard_class = self._objc.objc_getClass(b"NSPasteboard")
+        self._string_class = self._objc.objc_getClass(b"NSString")
+        self._string_type = ctypes.c_void_p.in_dll(
+            self._appkit, "NSPasteboardTypeString"
+        ).value
+        self._selectors = {
+            name: self._objc.sel_registerName(name)
+            for name in (
+                b"generalPasteboard",
+                b"clearContents",
+                b"alloc",
+                b"initWithUTF8String:",
+                b"setString:forType:",
+                b"release",
+            )
+        }
+
+    def _send(self, receiver, selector: bytes, *args, restype=ctypes.c_void_p):
+        # objc_msgSend must be called with the exact prototype on arm64, so
+        # build a fresh function pointer per signature instead of sharing one.
+        argtypes = [ctypes.c_void_p, ctypes.c_void_p] + [type(a) for a in args]
+        send = ctypes.CFUNCTYPE(restype, *argtypes)(
+            ctypes.cast(self._objc.objc_msgSend, ctypes.c_void_p).value
+        )
+        return send(receiver, self._selectors[selector], *args)
+
+    def copy(self, text: str) -> None:
+        pasteboard = self._send(self._pasteboard_class, b"generalPasteboard")
+        string = self._send(self._string_class, b"alloc")
+        string = self._send(
+            ctypes.c_void_p(string),
+            b"initWithUTF8String:",
+            ctypes.c_char_p(text.encode("utf-8")),
+        )
+        if not pasteboard or not string:
+            raise ClipboardError("NSPasteboard is not available")
+        try:
+            self._send(ctypes.c_void_p(pasteboard), b"clearContents", restype=ctypes.c_long)
+            ok = self._send(
+                ctypes.c_void_p(pasteboard),
+                b"setString:forType:",
+                ctypes.c_void_p(string),
+                ctypes.c_void_p(self._string_type),
+                restype=ctypes.c_bool,
+            )
+        finally:
+            self._send(ctypes.c_void_p(string), b"release", restype=None)
+        if not ok:
+            raise ClipboardError("NSPasteboard setString:forType: failed")
+
+
+def _linux_backend() -> ClipboardBackend:
+    """Return the Wayland or X11 helper that is installed, preferring Wayland."""
+    candidates = []
+    if os.environ.get("WAYLAND_DISPLAY"):
+        candidates.append(["wl-copy"])
+    candidates += [["xclip", "-selection", "clipboard"], ["xsel", "--clipboard", "--input"]]
+    for argv in candidates:
+        path = shutil.which(argv[0])
+        if path:
+            return CommandClipboard([path] + argv[1:])
+    raise ClipboardError("no clipboard helper found; install wl-clipboard or xclip")
+
+
+def default_clipboard_backend() -> ClipboardBackend:
+    """Build the best backend for this platform, falling back to a helper command."""
+    if os.name == "nt":
+        try:
+            return WindowsClipboard()
+        except (OSError, AttributeError):
+            # clip.exe reads BOM-less input in the OEM code page.
+            return CommandClipboard(["clip.exe"], encoding="utf-16-le", prefix="\ufeff")
+    if sys.platform == "darwin":
+        try:
+            return MacClipboard()
+        except (OSError, ValueError, ClipboardError):
+            return CommandClipboard(["pbcopy"])
+    return _linux_backend()
+
+
+# ── Session backend ───────────────────────────────────────────────────────────
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_clipboard_backend() -> ClipboardBackend:
+    """Return the session backend, creating the platform default on first use."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = default_clipboard_backend()
+        return _backend
+
+
+def set_clipboard_backend(backend: ClipboardBackend | None) -> None:
+    """Replace the session backend (e.g. with MemoryClipboard in tests).
+
+    Passing None closes the current backend; the next copy picks the platform
+    default again.
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is not None and _backend is not backend:
+            _backend.close()
+        _backend = backend
+
+
+def copy_text(text: str) -> None:
+    """Place *text* on the clipboard through the session backend.
+
+    Copies are serialized, so this may be called from worker threads.
+    """
+    backend = get_clipboard_backend()
+    with _backend_lock:
+        backend.copy(text)
+
+
+# ── Benchmark ─────────────────────────────────────────────────────────────────
+
+
+def benchmark_clipboard(
+    iterations: int = 20, backends: list[ClipboardBackend] = None
+) -> dict:
+    """Time `iterations` copies per backend.
+
+    Defaults to the legacy shell copy and the platform backend. Returns
+    {backend name: {"mean_ms", "median_ms", "max_ms"}} — or {"error": str}
+    for a backend that cannot run here.
+    """
+    if backends is None:
+        backends = [LegacyShellClipboard(), MemoryClipboard()]
+        try:
+            backends.insert(1, default_clipboard_backend())
+        except ClipboardError:
+            pass
+
+    text = 'fusion360://lineageUrn=urn%3Aadsk&documentName=Bracket "rev B"'
+    results = {}
+    for backend in backends:
+        samples = []
+        try:
+            for _ in range(iterations):
+                t0 = time.perf_counter()
+                backend.copy(text)
+                samples.append((time.perf_counter() - t0) * 1000.0)
+        except Exception as e:
+            results[backend.name] = {"error": str(e)}
+            continue
+        finally:
+            backend.close()
+        samples.sort()
+        results[backend.name] = {
+            "mean_ms": round(sum(samples) / len(samples), 3),
+            "median_ms": round(samples[len(samples) // 2], 3),
+            "max_ms": round(samples[-1], 3),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    for backend_name, stats in benchmark_clipboard(count).items():
+        print(f"{backend_name:<16} {stats}")
@@ -0,0 +1,190 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2022-2026 IMA LLC
+
+"""Debounce / throttle bursts of Fusion events.
+
+Opening an assembly activates and opens many documents in a row, and
+selection or input-changed events arrive at typing speed. Work hung on
+those events should run once per burst, not once per event:
+
+    futil.add_coalesced_handler(
+        app.documentActivated,
+        prefetch,
+        payload=lambda args: args.document.dataFile.id,
+        window_seconds=0.3,
+    )
+
+Each event is reduced to a (key, payload) pair on the UI thread while the
+event args are valid. A scheduler thread tracks one pending entry per key,
+and when its window closes fires a custom event, so `callback(payload)`
+always runs on the UI thread with the latest payload of the burst.
+
+  debounce  fires `window_seconds` after the last event of a burst (but no
+            later than `max_wait_seconds` after the first one)
+  throttle  fires `window_seconds` after the first event of a burst; events
+            inside the window only replace the payload
+"""
+
+import functools
+import itertools
+import threading
+import time
+from typing import Callable
+
+import adsk.core
+
+from .event_utils import add_handler, register_custom_event, unregister_custom_event
+from . import general_utils as futil
+
+app = adsk.core.Application.get()
+
+COALESCE_EVENT_ID = futil.custom_event_id("coalescedEvent")
+
+DEBOUNCE = "debounce"
+THROTTLE = "throttle"
+
+DEFAULT_COALESCE_WINDOW_SECONDS = 0.25
+
+# Without an explicit max_wait_seconds, a debounced burst fires at the latest
+# this many windows after its first event.
+DEFAULT_MAX_WAIT_WINDOWS = 4
+
+_scheduler = None
+
+
+class _CoalesceScheduler:
+    """Holds pending entries per key and fires them when their window closes."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        # {key: {"callback", "payload", "name", "deadline", "events"}}
+        self._pending = {}
+        # {token: entry} fired and waiting for the UI thread
+        self._ready = {}
+        self._tokens = itertools.count(1)
+        self._stopping = False
+        self._thread = threading.Thread(
+            target=self._run, name="PTSHD-coalesce", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, key, callback, payload, name, mode, window, max_wait) -> None:
+        now = time.monotonic()
+        with self._condition:
+            entry = self._pending.get(key)
+            if entry is None:
+                self._pending[key] = {
+                    "callback": callback,
+                    "payload": payload,
+                    "name": name,
+                    "deadline": now + window,
+                    "latest": now + max_wait,
+                    "events": 1,
+                }
+            else:
+                entry["payload"] = payload
+                entry["events"] += 1
+                if mode == DEBOUNCE:
+                    entry["deadline"] = min(now + window, entry["latest"])
+            self._condition.notify()
+
+    def take(self, token: str):
+        with self._condition:
+            return self._ready.pop(token, None)
+
+    def _run(self) -> None:
+        with self._condition:
+            while not self._stopping:
+                now = time.monotonic()
+                for key in [k for k, e in self._pending.items() if e["deadline"] <= now]:
+                    token = str(next(self._tokens))
+                    self._ready[token] = self._pending.pop(key)
+                    app.fireCustomEvent(COALESCE_EVENT_ID, token)
+                deadlines = [e["deadline"] for e in self._pending.values()]
+                self._condition.wait(max(min(deadlines) - now, 0) if deadlines else None)
+
+    def close(self) -> None:
+        with self._condition:
+            self._stopping = True
+            self._pending.clear()
+            self._ready.clear()
+            self._condition.notify()
+        self._thread.join(timeout=2)
+
+
+def _dispatch(args: adsk.core.CustomEventArgs):
+    scheduler = _scheduler
+    entry = scheduler.take(args.additionalInfo) if scheduler else None
+    if entry is None:
+        return
+    try:
+        entry["callback"](entry["payload"])
+    except:
+        futil.handle_error(entry["name"])
+
+
+def _ensure_scheduler() -> _CoalesceScheduler:
+    global _scheduler
+    if _scheduler is None:
+        register_custom_event(COALESCE_EVENT_ID, _dispatch, name="coalesce.dispatch")
+        _scheduler = _CoalesceScheduler()
+    return _scheduler
+
+
+def add_coalesced_handler(
+    event: adsk.core.Event,
+    callback: Callable,
+    *,
+    payload: Callable,
+    mode: str = DEBOUNCE,
+    window_seconds: float = DEFAULT_COALESCE_WINDOW_SECONDS,
+    max_wait_seconds: float = None,
+    key: Callable = None,
+    name: str = None,
+    local_handlers: list = None,
+):
+    """Connect `callback(payload)` to *event*, run at most once per burst per key.
+
+    Arguments:
+    payload -- `payload(args)` extracts what the callback needs while the
+               event args are valid; the args themselves are never kept, as
+               they are no longer valid when the callback runs. Returning
+               None drops the event. Required.
+    mode -- DEBOUNCE or THROTTLE (see the module docstring).
+    key -- `key(args)` returns the hashable burst key; events with different
+           keys are coalesced separately, and coalesced handlers returning
+           the same key share one burst. Default: a key private to this
+           handler.
+    name, local_handlers -- as for add_handler().
+
+    Must be called on the UI thread. Returns the underlying event handler.
+    """
+    if mode not in (DEBOUNCE, THROTTLE):
+        raise ValueError(f"Unknown coalescing mode: {mode}")
+    scheduler = _ensure_scheduler()
+    name = name or getattr(callback, "__name__", "coalesced")
+    max_wait = (
+        max_wait_seconds
+        if max_wait_seconds is not None
+        else window_seconds * DEFAULT_MAX_WAIT_WINDOWS
+    )
+    handler_key = object()
+
+    @functools.wraps(callback)
+    def coalesce(args):
+        value = payload(args)
+        if value is None:
+            return
+        burst_key = key(args) if key is not None else handler_key
+        scheduler.submit(burst_key, callback, value, name, mode, window_seconds, max_wait)
+
+    return add_handler(event, coalesce, name=name, local_handlers=local_handlers)
+
+
+def stop_coalescing() -> None:
+    """Drop pending bursts, stop the scheduler and unregister its event."""
+    global _scheduler
+    scheduler, _scheduler = _scheduler, None
+    if scheduler is not None:
+        scheduler.close()
+    unregister_custom_event(COALESCE_EVENT_ID)
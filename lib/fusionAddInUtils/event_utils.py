@@ -9,16 +9,37 @@
 #  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
 #  UNINTERRUPTED OR ERROR FREE.
 
+import gc
+import json
+import os
+import re
 import sys
+import time
+import types
+import weakref
 from typing import Callable
 
 import adsk.core
-from .general_utils import handle_error
+from .general_utils import PROFILE_HANDLERS, PROFILE_MEMORY, STALL_WATCHDOG, handle_error
+from .perf_utils import LatencyHistogram
 
 
 # Global Variable to hold Event Handlers
 _handlers = []
 
+# {event class: handler type named in its add() annotation}
+_handler_types = {}
+# {handler type: Handler subclass}. The callback and name are bound per
+# instance, so one class per handler type serves every add_handler() call.
+_handler_classes = {}
+
+# Every Handler instance still alive, without keeping any of them alive.
+_live_handlers = weakref.WeakSet()
+# {(owner, handler type name): handlers created}
+_created_counts = {}
+# {handler label: LatencyHistogram of notify() durations}
+_dispatch_latency = {}
+
 
 def add_handler(
     event: adsk.core.Event,
@@ -46,8 +67,7 @@ def add_handler(
     :returns:
         The event handler that was created.  You don't often need this reference, but it can be useful in some cases.
     """
-    module = sys.modules[event.__module__]
-    handler_type = module.__dict__[event.add.__annotations__["handler"]]
+    handler_type = _handler_type_for(event)
     handler = _create_handler(handler_type, callback, event, name, local_handlers)
     event.add(handler)
     return handler
@@ -59,6 +79,56 @@ def clear_handlers():
     _handlers = []
 
 
+def register_custom_event(
+    event_id: str,
+    callback: Callable,
+    *,
+    name: str = None,
+    local_handlers: list = None
+) -> adsk.core.CustomEvent:
+    """Registers a custom event and connects a handler to it.
+
+    Any existing registration with the same id is removed first so a reloaded
+    add-in does not end up with two handlers. Fire the event with
+    `app.fireCustomEvent(event_id, additional_info)`; the callback runs on the
+    UI thread once Fusion is idle, even when fired from a worker thread.
+
+    :returns:
+        The registered CustomEvent.
+    """
+    unregister_custom_event(event_id)
+    custom_event = adsk.core.Application.get().registerCustomEvent(event_id)
+    add_handler(
+        custom_event, callback, name=name or event_id, local_handlers=local_handlers
+    )
+    return custom_event
+
+
+def unregister_custom_event(event_id: str):
+    """Unregisters a custom event if it is registered."""
+    try:
+        adsk.core.Application.get().unregisterCustomEvent(event_id)
+    except:
+        pass
+
+
+def _handler_type_for(event: adsk.core.Event):
+    event_type = type(event)
+    handler_type = _handler_types.get(event_type)
+    if handler_type is None:
+        module = sys.modules[event.__module__]
+        handler_type = module.__dict__[event.add.__annotations__["handler"]]
+        _handler_types[event_type] = handler_type
+    return handler_type
+
+
+def _handler_class(handler_type):
+    handler_class = _handler_classes.get(handler_type)
+    if handler_class is None:
+        handler_class = _handler_classes[handler_type] = _define_handler(handler_type)
+    return handler_class
+
+
 def _create_handler(
     handler_type,
     callback: Callable,
@@ -66,22 +136,254 @@ def _create_handler(
     name: str = None,
     local_handlers: list = None,
 ):
-    handler = _define_handler(handler_type, callback, name)()
+    owner = _registering_module() if local_handlers is not None else None
+    handler = _handler_class(handler_type)(callback, name, owner)
     (local_handlers if local_handlers is not None else _handlers).append(handler)
     return handler
 
 
-def _define_handler(handler_type, callback, name: str = None):
-    name = name or handler_type.__name__
+def _registering_module() -> str:
+    """Return the name of the module that called into this one."""
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_globals.get("__name__") == __name__:
+        frame = frame.f_back
+    return frame.f_globals.get("__name__", "") if frame is not None else ""
+
+
+def callback_label(callback, name: str = None) -> str:
+    """Return a file-name friendly label such as `shareDocument.command_execute`.
+
+    An explicit *name* (e.g. `shareDocument.command_created` for a button
+    handler defined in commands/__init__.py) is used as is; otherwise the
+    label is built from the callback's command folder or module and name.
+    """
+    if name:
+        label = name
+    else:
+        module = getattr(callback, "__module__", "") or ""
+        parts = module.split(".")
+        owner = parts[-2] if len(parts) > 1 and parts[-1] == "entry" else parts[-1]
+        label = f"{owner}.{getattr(callback, '__qualname__', 'handler')}"
+    return re.sub(r"[^\w\-.]", "_", label)
+
+
+def _define_handler(handler_type):
+    # The profiling and stall-watchdog hooks are only imported when their
+    # config flag is on; otherwise notify() never calls into them.
+    profile = PROFILE_HANDLERS or PROFILE_MEMORY
+    if profile:
+        from .profile_utils import is_profiled, profile_call
+    watch_stalls = STALL_WATCHDOG
+    if watch_stalls:
+        from .watchdog_utils import begin_handler_watch, end_handler_watch
 
     class Handler(handler_type):
-        def __init__(self):
+        def __init__(
+            self,
+            callback: Callable,
+            name: str = None,
+            local_owner: str = None,
+            track: bool = True,
+        ):
             super().__init__()
+            self.callback = callback
+            self.name = name or handler_type.__name__
+            self.label = callback_label(callback, name)
+            self.profile = profile and is_profiled(callback)
+            # Module whose `local_handlers` list holds this handler, or None
+            # for the global _handlers list. Only the name is kept: the list
+            # itself may be replaced when the command is destroyed.
+            self.local_owner = local_owner
+            self.event_type = handler_type.__name__
+            self.created = time.monotonic()
+            if track:
+                _track_handler(self)
 
         def notify(self, args):
+            watch = begin_handler_watch(self.label) if watch_stalls else None
+            t0 = time.perf_counter()
             try:
-                callback(args)
+                if self.profile:
+                    profile_call(self.label, self.callback, args)
+                else:
+                    self.callback(args)
             except:
-                handle_error(name)
+                handle_error(self.name)
+            finally:
+                _record_dispatch(self.label, time.perf_counter() - t0)
+                if watch is not None:
+                    end_handler_watch(watch)
 
     return Handler
+
+
+def benchmark_handler_creation(handler_type=None, iterations: int = 1000) -> dict:
+    """Compare creating handlers with a new class per call against the class cache.
+
+    A click on a command button creates two handlers (execute and destroy) in
+    command_created. Handlers are created but not connected to any event,
+    and are left out of live_handler_counts() and handler_report().
+    Returns {case: {"us_per_handler", "bytes_per_handler"}}.
+    """
+    import time
+    import tracemalloc
+
+    handler_type = handler_type or adsk.core.CommandEventHandler
+
+    def callback(args):
+        pass
+
+    cases = {
+        "class per call": lambda: _define_handler(handler_type)(
+            callback, "bench", track=False
+        ),
+        "cached class": lambda: _handler_class(handler_type)(
+            callback, "bench", track=False
+        ),
+    }
+    results = {}
+    for case, create in cases.items():
+        keep = []
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        for _ in range(iterations):
+            keep.append(create())
+        elapsed = time.perf_counter() - t0
+        allocated = tracemalloc.get_traced_memory()[0] - before
+        if not tracing:
+            tracemalloc.stop()
+        results[case] = {
+            "us_per_handler": round(elapsed / iterations * 1e6, 2),
+            "bytes_per_handler": allocated // iterations,
+        }
+    return results
+
+
+# ── Handler accounting ────────────────────────────────────────────────────────
+
+
+def _handler_owner(handler) -> str:
+    """Command folder or utility module that registered *handler*."""
+    return handler.label.partition(".")[0]
+
+
+def _track_handler(handler) -> None:
+    _live_handlers.add(handler)
+    key = (_handler_owner(handler), handler.event_type)
+    _created_counts[key] = _created_counts.get(key, 0) + 1
+
+
+def _record_dispatch(label: str, seconds: float) -> None:
+    histogram = _dispatch_latency.get(label)
+    if histogram is None:
+        histogram = _dispatch_latency[label] = LatencyHistogram()
+    histogram.record(seconds)
+
+
+def live_handler_counts(collect: bool = True) -> list[dict]:
+    """Return [{owner, eventType, live, created}] for every handler kind seen.
+
+    With `collect`, a garbage collection runs first so handlers that are only
+    held by reference cycles are not counted as live.
+    """
+    if collect:
+        gc.collect()
+    live = {}
+    for handler in list(_live_handlers):
+        key = (_handler_owner(handler), handler.event_type)
+        live[key] = live.get(key, 0) + 1
+    return [
+        {
+            "owner": owner,
+            "eventType": event_type,
+            "live": live.get((owner, event_type), 0),
+            "created": created,
+        }
+        for (owner, event_type), created in sorted(_created_counts.items())
+    ]
+
+
+# The two helpers below are kept out of find_leaked_handlers() so that no
+# closure cell there refers to the handler being checked.
+
+
+def _holds(handlers: list, handler) -> bool:
+    return any(h is handler for h in handlers)
+
+
+def _referrer_types(handler, candidates: list) -> list[str]:
+    own_dict = handler.__dict__
+    return [
+        type(referrer).__name__
+        for referrer in gc.get_referrers(handler)
+        if referrer is not candidates
+        and referrer is not own_dict
+        and not isinstance(referrer, types.FrameType)
+    ]
+
+
+def find_leaked_handlers(min_age_seconds: float = 1.0) -> list[dict]:
+    """Return handlers that are alive but no longer registered anywhere.
+
+    A handler is expected to be held by the current global `_handlers` list
+    or by the current `local_handlers` list of the module that called
+    add_handler(). Handlers older than *min_age_seconds* that survive a
+    garbage collection without being in that list are kept alive by
+    something else — usually a stale list or a closure — and are reported
+    as leaks.
+    """
+    gc.collect()
+    now = time.monotonic()
+    leaks = []
+    candidates = list(_live_handlers)
+    for handler in candidates:
+        if now - handler.created < min_age_seconds:
+            continue
+        if handler.local_owner is None:
+            holder = _handlers
+        else:
+            module = sys.modules.get(handler.local_owner)
+            holder = getattr(module, "local_handlers", None)
+        if isinstance(holder, list) and _holds(holder, handler):
+            continue
+        holders = _referrer_types(handler, candidates)
+        leaks.append(
+            {
+                "handler": handler.label,
+                "eventType": handler.event_type,
+                "ageSeconds": round(now - handler.created, 1),
+                "heldBy": holders,
+            }
+        )
+    return leaks
+
+
+def dispatch_latency_report() -> list[dict]:
+    """Return per-handler notify() latency, slowest p99 first."""
+    rows = [
+        {"handler": label, **histogram.summary()}
+        for label, histogram in _dispatch_latency.items()
+    ]
+    rows.sort(key=lambda row: row["p99_ms"], reverse=True)
+    return rows
+
+
+def handler_report() -> dict:
+    """Return live counts, suspected leaks and dispatch latency in one dict."""
+    return {
+        "globalHandlers": len(_handlers),
+        "liveHandlers": live_handler_counts(),
+        "leaks": find_leaked_handlers(),
+        "dispatch": dispatch_latency_report(),
+    }
+
+
+def dump_handler_report(path: str) -> str:
+    """Write handler_report() to *path* as JSON and return the path."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(handler_report(), fh, indent=2)
+    return path
@@ -0,0 +1,160 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2022-2026 IMA LLC
+
+"""Background worker pool with completion callbacks on the UI thread.
+
+The Fusion API may only be used on the UI thread, but pure-Python work —
+JSON cache encoding, link formatting, CSV export, hashing, clipboard
+copies — can run anywhere. `submit()` runs such work on a small thread pool
+and delivers the result to callbacks that always run on the UI thread, so
+they may touch `adsk` objects:
+
+    futil.submit(
+        json.dumps, payload,
+        on_done=lambda text: write_and_report(text),
+        on_error=lambda exc: ui.messageBox(str(exc)),
+    )
+
+Never pass `adsk` objects into the worker function itself.
+
+Completed work is put on a queue and one `<add-in>_executorComplete` custom
+event drains it; a burst of completions costs one event, not one per task.
+Call `start_executor()` at add-in start (UI thread) and `stop_executor()`
+at stop.
+"""
+
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+import adsk.core
+
+from .event_utils import register_custom_event, unregister_custom_event
+from . import general_utils as futil
+
+app = adsk.core.Application.get()
+
+EXECUTOR_COMPLETE_EVENT_ID = futil.custom_event_id("executorComplete")
+
+DEFAULT_MAX_WORKERS = 2
+
+_pool = None
+# (callback, value, name) waiting to run on the UI thread
+_completions = queue.SimpleQueue()
+_drain_lock = threading.Lock()
+_drain_pending = False
+
+
+# ── Main-thread marshaling ────────────────────────────────────────────────────
+
+
+def run_on_main_thread(callback: Callable, *args, name: str = None) -> None:
+    """Run `callback(*args)` on the UI thread when Fusion is idle.
+
+    Safe to call from any thread once the executor is started.
+    """
+    global _drain_pending
+    name = name or getattr(callback, "__name__", "task")
+    _completions.put((callback, args, name))
+    with _drain_lock:
+        if _drain_pending:
+            return
+        _drain_pending = True
+    app.fireCustomEvent(EXECUTOR_COMPLETE_EVENT_ID, "")
+
+
+def _drain_completions(args: adsk.core.CustomEventArgs):
+    global _drain_pending
+    with _drain_lock:
+        _drain_pending = False
+    while True:
+        try:
+            callback, callback_args, name = _completions.get_nowait()
+        except queue.Empty:
+            return
+        try:
+            callback(*callback_args)
+        except:
+            futil.handle_error(name)
+
+
+# ── Worker pool ───────────────────────────────────────────────────────────────
+
+
+def submit(
+    fn: Callable,
+    *args,
+    on_done: Callable = None,
+    on_error: Callable = None,
+    name: str = None,
+    **kwargs,
+) -> Future:
+    """Run `fn(*args, **kwargs)` on a worker thread.
+
+    `on_done(result)` or `on_error(exception)` then runs on the UI thread.
+    Without `on_error`, exceptions are logged through handle_error(). `fn`
+    must not use the Fusion API. Returns the concurrent.futures.Future.
+    """
+    if _pool is None:
+        raise RuntimeError("The executor is not running; call start_executor().")
+    name = name or getattr(fn, "__name__", "task")
+
+    def finished(future: Future):
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is None:
+            if on_done is not None:
+                run_on_main_thread(on_done, future.result(), name=name)
+        elif on_error is not None:
+            run_on_main_thread(on_error, error, name=name)
+        else:
+            run_on_main_thread(_report_error, name, error, name=name)
+
+    future = _pool.submit(_run_task, name, fn, args, kwargs)
+    future.add_done_callback(finished)
+    return future
+
+
+def _run_task(name: str, fn: Callable, args: tuple, kwargs: dict):
+    with futil.perf_timer(name, "executor"):
+        return fn(*args, **kwargs)
+
+
+def _report_error(name: str, error: BaseException) -> None:
+    futil.log(
+        f"{name}: background task failed: {error!r}", adsk.core.LogLevels.ErrorLogLevel
+    )
+
+
+def start_executor(max_workers: int = DEFAULT_MAX_WORKERS) -> None:
+    """Create the worker pool and register the completion event (UI thread)."""
+    global _pool
+    stop_executor()
+    register_custom_event(
+        EXECUTOR_COMPLETE_EVENT_ID, _drain_completions, name="executor.complete"
+    )
+    _pool = ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="PTSHD-worker"
+    )
+
+
+def stop_executor() -> None:
+    """Cancel queued work, drop undelivered completions and unregister the event.
+
+    Tasks already running finish in the background; their callbacks are
+    discarded.
+    """
+    global _pool, _drain_pending
+    pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+    unregister_custom_event(EXECUTOR_COMPLETE_EVENT_ID)
+    while True:
+        try:
+            _completions.get_nowait()
+        except queue.Empty:
+            break
+    with _drain_lock:
+        _drain_pending = False
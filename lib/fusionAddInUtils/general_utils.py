@@ -9,25 +9,44 @@
 #  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
 #  UNINTERRUPTED OR ERROR FREE.
 
-import os
-import subprocess
 import time
 import traceback
 from contextlib import contextmanager
 import adsk.core
 
+from .clipboard_utils import copy_text
+from .perf_utils import begin_span, end_span, record_latency
+
 app = adsk.core.Application.get()
 ui = app.userInterface
 
-# Attempt to read DEBUG and PERF_TRACE flags from parent config.
+# Attempt to read the DEBUG, PERF_TRACE, PROFILE_* and STALL_WATCHDOG flags and
+# the add-in name from parent config.
 try:
     from ... import config
 
     DEBUG = getattr(config, "DEBUG", False)
     PERF_TRACE = getattr(config, "PERF_TRACE", False)
+    PROFILE_HANDLERS = getattr(config, "PROFILE_HANDLERS", False)
+    PROFILE_MEMORY = getattr(config, "PROFILE_MEMORY", False)
+    STALL_WATCHDOG = getattr(config, "STALL_WATCHDOG", False)
+    EVENT_ID_PREFIX = getattr(config, "ADDIN_NAME", "PTSHD")
 except Exception:
     DEBUG = False
     PERF_TRACE = False
+    PROFILE_HANDLERS = False
+    PROFILE_MEMORY = False
+    STALL_WATCHDOG = False
+    EVENT_ID_PREFIX = "PTSHD"
+
+# Set by log_utils.start_buffered_logging(); None means log synchronously.
+_log_sink = None
+
+_LEVEL_NAMES = {
+    adsk.core.LogLevels.InfoLogLevel: "info",
+    adsk.core.LogLevels.WarningLogLevel: "warning",
+    adsk.core.LogLevels.ErrorLogLevel: "error",
+}
 
 
 def log(
@@ -42,7 +61,8 @@ def log(
     True. When DEBUG is False this function is a no-op.
 
     Arguments:
-    message -- The message to log.
+    message -- The message to log, or a callable returning it. A callable is
+               only called when logging is enabled.
     level -- The logging severity level.
     force_console -- Retained for backward compatibility. It no longer
                      overrides the config.DEBUG gate.
@@ -51,6 +71,17 @@ def log(
     if not DEBUG:
         return
 
+    if callable(message):
+        message = message()
+
+    if _log_sink is not None:
+        # Buffered: the record is written to the log file off the UI thread
+        # and only a periodic summary reaches the Text Commands window.
+        _log_sink.enqueue(_LEVEL_NAMES.get(level, "info"), message)
+        if level == adsk.core.LogLevels.ErrorLogLevel:
+            app.log(message, level, adsk.core.LogTypes.FileLogType)
+        return
+
     # Goes to the attached debugger / IDE stdout only.
     print(message)
 
@@ -62,21 +93,73 @@ def log(
     app.log(message, level, adsk.core.LogTypes.ConsoleLogType)
 
 
+def log_lazy(
+    message: str,
+    *args,
+    level: adsk.core.LogLevels = adsk.core.LogLevels.InfoLogLevel,
+):
+    """Log a %-style template that is only formatted when logging is enabled.
+
+    Use this instead of log(f"...") on hot paths: with DEBUG off no string is
+    built and no argument is converted. Pass a callable argument (e.g.
+    `lambda: document.name`) to defer Fusion API access as well; it is
+    called only when the message is formatted.
+
+        futil.log_lazy("%s Share job finished for %s", CMD_NAME, lambda: document.name)
+    """
+    if not DEBUG:
+        return
+    if args:
+        message = message % tuple(arg() if callable(arg) else arg for arg in args)
+    log(message, level)
+
+
+def is_logging_enabled() -> bool:
+    """Return True when log() writes anything, i.e. config.DEBUG is on.
+
+    Guard blocks that gather data only for logging with this.
+    """
+    return DEBUG
+
+
+def set_log_sink(sink) -> None:
+    """Send log() records to *sink*.enqueue(level, message) instead of writing
+    them synchronously. Pass None to restore direct logging.
+    """
+    global _log_sink
+    _log_sink = sink
+
+
+def custom_event_id(name: str) -> str:
+    """Return the id of this add-in's custom event *name*.
+
+    Every PowerTools add-in vendors this package, so the ids are prefixed with
+    the add-in name (config.ADDIN_NAME); one add-in registering its events
+    never replaces another add-in's.
+    """
+    return f"{EVENT_ID_PREFIX}_{name}"
+
+
 def clipText(linkText):
     """Utility function to copy text to the clipboard.
 
     Augments:
     linkText -- string to copy to system clipboard.
     """
-    if os.name == "nt":
-        subprocess.run(
-            ["clip.exe"], input=linkText.strip().encode("utf-8"), check=True, shell=True
-        )
-    else:
-        os.system(f'echo "{linkText.strip()}" | pbcopy')
+    copy_to_clipboard(linkText)
     app.log(f"link: {linkText} was added to clipboard")
 
 
+def copy_to_clipboard(text):
+    """Copy text to the system clipboard without touching the Fusion API.
+
+    Unlike clipText this does not log through app.log, so it is safe to call
+    from a worker thread. The platform backend is chosen once per session;
+    see clipboard_utils.
+    """
+    copy_text(text.strip())
+
+
 def isSaved() -> bool:
     """Utility function to check if the active document has been saved.
 
@@ -114,11 +197,15 @@ def handle_error(name: str, show_message_box: bool = False):
 
 
 @contextmanager
-def perf_timer(label: str, context: str = ""):
-    """Wall-clock timer for diagnosing performance bottlenecks.
+def perf_timer(label: str, context: str = "", **args):
+    """Wall-clock timer and trace span for diagnosing performance bottlenecks.
 
     Wraps a block of code and, when config.PERF_TRACE is True, emits a
-    structured [PERF] line to the Fusion Text Command window on exit.
+    structured [PERF] line to the Fusion Text Command window on exit,
+    records the duration in the (context, label) latency histogram, and
+    records a span nested under any enclosing perf_timer on the same thread
+    (see perf_utils.dump_histograms() and perf_utils.write_chrome_trace()).
+    Keyword *args* are attached to the span.
 
     Usage:
         with futil.perf_timer("documents.open", "GP._load_from_doc"):
@@ -129,9 +216,33 @@ def perf_timer(label: str, context: str = ""):
     if not PERF_TRACE:
         yield
         return
+    span = begin_span()
     t0 = time.perf_counter()
     try:
         yield
     finally:
         elapsed = time.perf_counter() - t0
+        end_span(span, label, context, t0, elapsed, args)
+        record_latency(label, context, elapsed)
         log(f"[PERF] {context:<30} | {label:<35} | {elapsed:.3f} s", force_console=True)
+
+
+@contextmanager
+def perf_span(label: str, context: str = "", **args):
+    """perf_timer() without the [PERF] log line, for blocks inside loops.
+
+    With config.PERF_TRACE on, the block is still recorded as a trace span
+    and in the (context, label) latency histogram, so a polling loop is
+    measured without flooding the log or timing its own logging.
+    """
+    if not PERF_TRACE:
+        yield
+        return
+    span = begin_span()
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - t0
+        end_span(span, label, context, t0, elapsed, args)
+        record_latency(label, context, elapsed)
@@ -0,0 +1,259 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2022-2026 IMA LLC
+
+"""Central builder for the links handed out by the Share Menu commands.
+
+Link formats:
+  desktop  fusion360://lineageUrn=<id>&hubUrl=<HUB>&documentName=<name>
+  team     dataFile.fusionWebURL
+  invite   <project root>==/fpV2?redirectSource=fremont&action=ffpInviteMembers
+  members  <project root>==/fpV2?redirectSource=fremont&action=ffpViewMembers
+
+The hub part of desktop links and the project root of invite/members links
+are derived once and cached by hub id and project id. The `*_link` functions
+are pure string builders, so generating links for many files costs one hub
+lookup:
+
+    hub_prefix = futil.hub_url_prefix(project.parentHub)
+    for data_file in files:
+        futil.desktop_link(data_file.id, data_file.name, hub_prefix)
+
+The `*_for_file` helpers resolve and cache the hub/project of a single data
+file for the active-document commands.
+
+`export_folder_links(folder, output_path, ...)` streams desktop and team
+links for a whole folder tree to CSV or JSON Lines without opening any
+document. Folders and files are walked lazily, one `item(i)` at a time, so
+memory stays flat however big the hub is. After each folder the output is
+flushed and a checkpoint records the last completed folder.
+
+Cache files (written under add-in/cache/, next to the cache_utils files):
+  link_export_<folder-key>.json — checkpoint for an unfinished export: output
+                                   path and the last completed folder
+"""
+
+from urllib.parse import quote, unquote
+
+import adsk.core
+
+from .share_utils import (
+    ShareResultWriter,
+    clear_batch_checkpoint,
+    iter_folders,
+    read_batch_checkpoint,
+    write_batch_checkpoint,
+)
+from . import general_utils as futil
+
+LINK_EXPORT_CHECKPOINT_PREFIX = "link_export"
+
+# Column order for CSV output; JSON Lines rows use the same keys.
+LINK_EXPORT_FIELDS = ["name", "id", "version", "folder", "desktopLink", "teamLink"]
+
+# {hub_id: hub URL prefix used in desktop links}
+_hub_prefixes = {}
+# {project_id: project root URL used in invite/members links}
+_project_roots = {}
+# {data_file_id: (hub_id, project_id)}
+_file_owners = {}
+
+
+# ── Prefix caches ─────────────────────────────────────────────────────────────
+
+
+def hub_url_prefix(hub) -> str:
+    """Return the `hubUrl` value for desktop links to files in *hub*."""
+    prefix = _hub_prefixes.get(hub.id)
+    if prefix is None:
+        galilleo_url = hub.fusionWebURL
+        prefix = galilleo_url.replace(" ", "").rstrip(galilleo_url[-3:]).upper()
+        _hub_prefixes[hub.id] = prefix
+    return prefix
+
+
+def project_url_root(project, data_file) -> str:
+    """Return the Fusion Team root URL of *project*, derived from *data_file*.
+
+    *data_file* must belong to *project*; its web URL is trimmed after the
+    last "/" to get the project root.
+    """
+    root = _project_roots.get(project.id)
+    if root is None:
+        root = quote(data_file.fusionWebURL).rpartition("/")[0]
+        root = unquote(root)
+        _project_roots[project.id] = root
+    return root
+
+
+def _owners(data_file) -> tuple:
+    owners = _file_owners.get(data_file.id)
+    if owners is None:
+        project = data_file.parentProject
+        hub = project.parentHub
+        hub_url_prefix(hub)
+        project_url_root(project, data_file)
+        owners = (hub.id, project.id)
+        _file_owners[data_file.id] = owners
+    return owners
+
+
+def hub_url_prefix_for_file(data_file) -> str:
+    """Return the hub URL prefix for *data_file*, cached by file and hub id."""
+    return _hub_prefixes[_owners(data_file)[0]]
+
+
+def project_url_root_for_file(data_file) -> str:
+    """Return the project root URL for *data_file*, cached by file and project id."""
+    return _project_roots[_owners(data_file)[1]]
+
+
+def clear_link_caches() -> None:
+    """Forget every cached hub prefix and project root."""
+    _hub_prefixes.clear()
+    _project_roots.clear()
+    _file_owners.clear()
+
+
+# ── Link builders ─────────────────────────────────────────────────────────────
+
+
+def desktop_link(data_file_id: str, document_name: str, hub_prefix: str) -> str:
+    """Return the fusion360:// Open on Desktop link for a data-file id."""
+    return (
+        f"fusion360://lineageUrn={quote(data_file_id)}"
+        f"&hubUrl={quote(hub_prefix)}"
+        f"&documentName={quote(document_name)}"
+    )
+
+
+def team_link(data_file) -> str:
+    """Return the Fusion Team web link for *data_file*."""
+    return data_file.fusionWebURL
+
+
+def invite_link(project_root: str) -> str:
+    """Return the Fusion Team invite-members page for a project root URL."""
+    return f"{project_root}==/fpV2?redirectSource=fremont&action=ffpInviteMembers"
+
+
+def members_link(project_root: str) -> str:
+    """Return the Fusion Team project-members page for a project root URL."""
+    return f"{project_root}==/fpV2?redirectSource=fremont&action=ffpViewMembers"
+
+
+def desktop_link_for_file(data_file, document_name: str = None) -> str:
+    """Return the Open on Desktop link for *data_file* using the cached hub prefix."""
+    return desktop_link(
+        data_file.id,
+        document_name if document_name is not None else data_file.name,
+        hub_url_prefix_for_file(data_file),
+    )
+
+
+def invite_link_for_file(data_file) -> str:
+    """Return the invite-members link for *data_file*'s project."""
+    return invite_link(project_url_root_for_file(data_file))
+
+
+def members_link_for_file(data_file) -> str:
+    """Return the project-members link for *data_file*'s project."""
+    return members_link(project_url_root_for_file(data_file))
+
+
+# ── Bulk export ───────────────────────────────────────────────────────────────
+
+
+def export_folder_links(
+    folder,
+    output_path: str,
+    *,
+    resume: bool = False,
+    progress: adsk.core.ProgressDialog = None,
+    cmd_name: str = "",
+) -> dict:
+    """Stream one link row per data file under *folder* to *output_path*.
+
+    The hub prefix is looked up once for the whole tree. With `resume`,
+    folders up to and including the checkpoint's last completed folder are
+    skipped (their files are not enumerated), the output is truncated to its
+    size at that checkpoint, and rows are appended. Raises
+    ValueError if the folder tree changed so the checkpoint no longer lines
+    up. `progress`, if given, shows the running count and is checked for
+    cancellation after each folder.
+
+    Returns {"files", "folders", "cancelled", "outputPath"}.
+    """
+    checkpoint = (
+        read_batch_checkpoint(folder, LINK_EXPORT_CHECKPOINT_PREFIX) if resume else None
+    )
+    skip_through = checkpoint.get("lastFolderIndex", -1) if checkpoint else -1
+    if not resume:
+        clear_batch_checkpoint(folder, LINK_EXPORT_CHECKPOINT_PREFIX)
+
+    hub_prefix = hub_url_prefix(folder.parentProject.parentHub)
+    summary = {
+        "files": checkpoint.get("files", 0) if checkpoint else 0,
+        "folders": 0,
+        "cancelled": False,
+        "outputPath": output_path,
+    }
+
+    writer = ShareResultWriter(
+        output_path,
+        append=checkpoint is not None,
+        fieldnames=LINK_EXPORT_FIELDS,
+        truncate_to=checkpoint.get("outputOffset") if checkpoint else None,
+    )
+    try:
+        for folder_index, (folder_path, sub_folder) in enumerate(iter_folders(folder)):
+            if folder_index <= skip_through:
+                if folder_index == skip_through and sub_folder.id != checkpoint.get("lastFolderId"):
+                    raise ValueError(
+                        "The folder tree changed since the export was interrupted."
+                    )
+                continue
+
+            with futil.perf_timer("export folder", f"{cmd_name}.export_folder_links"):
+                data_files = sub_folder.dataFiles
+                for i in range(data_files.count):
+                    data_file = data_files.item(i)
+                    writer.write(
+                        {
+                            "name": data_file.name,
+                            "id": data_file.id,
+                            "version": data_file.versionNumber,
+                            "folder": folder_path,
+                            "desktopLink": desktop_link(data_file.id, data_file.name, hub_prefix),
+                            "teamLink": team_link(data_file),
+                        }
+                    )
+                    summary["files"] += 1
+            summary["folders"] += 1
+
+            writer.flush()
+            write_batch_checkpoint(
+                folder,
+                {
+                    "outputPath": output_path,
+                    "outputOffset": writer.offset(),
+                    "lastFolderIndex": folder_index,
+                    "lastFolderId": sub_folder.id,
+                    "files": summary["files"],
+                },
+                LINK_EXPORT_CHECKPOINT_PREFIX,
+            )
+            adsk.doEvents()
+            if progress is not None:
+                progress.message = (
+                    f"Exported {summary['files']} documents from {folder_path}"
+                )
+                if progress.wasCancelled:
+                    summary["cancelled"] = True
+                    break
+    finally:
+        writer.close()
+
+    if not summary["cancelled"]:
+        clear_batch_checkpoint(folder, LINK_EXPORT_CHECKPOINT_PREFIX)
+    futil.log_lazy("%s: link export finished %s", cmd_name, summary)
+    return summary
@@ -1,12 +1,50 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 # Copyright (C) 2022-2026 IMA LLC
 
-"""OS-aware log file conveniences shared across commands."""
+"""OS-aware log file conveniences shared across commands.
 
+`BufferedLogger` takes `futil.log()` records off the UI thread: `enqueue()`
+only appends to a bounded ring buffer, and a background thread writes the
+records as JSON lines with size-based rotation. Call
+`start_buffered_logging()` once at add-in start to route `futil.log()`
+through it; the Text Commands window then gets a periodic one-line summary
+instead of every message, and the full record stream is in the log file
+(follow it with `open_live_log_viewer()`).
+
+Add-ins attached to the shared runtime (runtime_utils) write one
+PowerTools.log.jsonl file; their messages are prefixed with
+"[<add-in name>]". Each add-in keeps its own logger and summary, and the
+writers take turns through the runtime's log lock.
+
+Log files (written under default_log_directory()):
+  <add-in name>.log.jsonl      — {"ts", "level", "thread", "msg"} per line
+  <add-in name>.log.jsonl.<n>  — rotated backups, 1 is the newest
+"""
+
+import json
 import os
 import subprocess
 import sys
 import tempfile
+import threading
+import time
+from collections import deque
+
+import adsk.core
+
+from .event_utils import register_custom_event, unregister_custom_event
+from .runtime_utils import SHARED_LOG_NAME, shared_runtime
+from . import general_utils as futil
+
+app = adsk.core.Application.get()
+
+LOG_SUMMARY_EVENT_ID = futil.custom_event_id("logSummary")
+
+DEFAULT_LOG_CAPACITY = 10000
+DEFAULT_FLUSH_INTERVAL_SECONDS = 0.5
+DEFAULT_SUMMARY_INTERVAL_SECONDS = 5.0
+DEFAULT_LOG_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_LOG_BACKUP_COUNT = 3
 
 
 def default_log_directory() -> str:
@@ -49,3 +87,288 @@ def open_live_log_viewer(log_file_path: str):
         )
     except Exception as e:
         return False, f"Failed to open live log viewer: {e}"
+
+
+# ── Buffered logger ───────────────────────────────────────────────────────────
+
+
+class BufferedLogger:
+    """Ring-buffered JSON-lines log writer with a background flush thread.
+
+    When more than `capacity` records are waiting, the oldest are dropped and
+    counted rather than blocking the caller. `on_summary(text)`, if given, is
+    called from the writer thread at most every `summary_interval` seconds
+    with a one-line summary of what was written.
+
+    Loggers writing the same file from several add-ins pass the same
+    `write_lock`; the file is then reopened for every flush, so a rotation
+    done by one writer is picked up by the others.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        capacity: int = DEFAULT_LOG_CAPACITY,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL_SECONDS,
+        summary_interval: float = DEFAULT_SUMMARY_INTERVAL_SECONDS,
+        max_bytes: int = DEFAULT_LOG_MAX_BYTES,
+        backup_count: int = DEFAULT_LOG_BACKUP_COUNT,
+        on_summary=None,
+        write_lock=None,
+    ):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.summary_interval = summary_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.on_summary = on_summary
+
+        self._buffer = deque(maxlen=capacity)
+        self._buffer_lock = threading.Lock()
+        self._write_lock = write_lock or threading.Lock()
+        self._reopen = write_lock is not None
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._file = None
+
+        self.dropped = 0
+        self._pending = {"records": 0, "warnings": 0, "errors": 0, "last": ""}
+        self._last_summary = time.monotonic()
+
+        self._thread = threading.Thread(
+            target=self._run, name="PTSHD-log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def enqueue(self, level: str, message: str) -> None:
+        """Queue one record. Never blocks on I/O; safe from any thread."""
+        record = (time.time(), level, threading.current_thread().name, message)
+        with self._buffer_lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append(record)
+        if level == "error":
+            self._wake.set()
+
+    def flush(self) -> None:
+        """Write every queued record now, on the calling thread."""
+        with self._buffer_lock:
+            records = list(self._buffer)
+            self._buffer.clear()
+        if not records:
+            return
+        with self._write_lock:
+            self._rotate_if_needed()
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            for ts, level, thread, message in records:
+                self._file.write(
+                    json.dumps(
+                        {"ts": round(ts, 3), "level": level, "thread": thread, "msg": message}
+                    )
+                )
+                self._file.write("\n")
+            self._file.flush()
+            if self._reopen:
+                self._file.close()
+                self._file = None
+
+            self._pending["records"] += len(records)
+            for _, level, _, message in records:
+                if level == "warning":
+                    self._pending["warnings"] += 1
+                elif level == "error":
+                    self._pending["errors"] += 1
+            self._pending["last"] = records[-1][3]
+
+    def summary(self) -> str | None:
+        """Return and reset the summary of records written since the last call."""
+        with self._write_lock:
+            pending = self._pending
+            if not pending["records"]:
+                return None
+            self._pending = {"records": 0, "warnings": 0, "errors": 0, "last": ""}
+        text = (
+            f"[LOG] {pending['records']} records "
+            f"({pending['warnings']} warnings, {pending['errors']} errors"
+        )
+        if self.dropped:
+            text += f", {self.dropped} dropped"
+        last = pending["last"].splitlines()[0] if pending["last"] else ""
+        return f"{text}) → {self.path} | last: {last[:120]}"
+
+    def close(self) -> None:
+        """Stop the writer thread after a final flush."""
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self.flush()
+        with self._write_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _rotate_if_needed(self) -> None:
+        try:
+            if os.path.getsize(self.path) < self.max_bytes:
+                return
+        except OSError:
+            return
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+                if (
+                    self.on_summary is not None
+                    and time.monotonic() - self._last_summary >= self.summary_interval
+                ):
+                    self._last_summary = time.monotonic()
+                    text = self.summary()
+                    if text:
+                        self.on_summary(text)
+            except Exception:
+                # Never let a logging failure kill the writer; try again next cycle.
+                pass
+
+
+_logger = None
+# (runtime, add-in name) while _logger writes the shared runtime's log file.
+_shared_logger_user = None
+
+
+class _AddinLogSink:
+    """Prefixes each record with the add-in name before the logger."""
+
+    def __init__(self, logger: BufferedLogger, name: str):
+        self.logger = logger
+        self.prefix = f"[{name}] "
+
+    def enqueue(self, level: str, message: str) -> None:
+        self.logger.enqueue(level, self.prefix + message)
+
+
+def _show_log_summary(args: adsk.core.CustomEventArgs):
+    app.log(
+        args.additionalInfo,
+        adsk.core.LogLevels.InfoLogLevel,
+        adsk.core.LogTypes.ConsoleLogType,
+    )
+
+
+def start_buffered_logging(name: str, directory: str = None, **options) -> str:
+    """Route futil.log() through a BufferedLogger writing <name>.log.jsonl.
+
+    *options* are passed to BufferedLogger. When the add-in is attached to
+    the shared runtime, the logger writes PowerTools.log.jsonl under the
+    runtime's log lock instead; the summary still only covers this add-in.
+    Returns the log file path.
+    """
+    global _logger, _shared_logger_user
+    stop_buffered_logging()
+    runtime = shared_runtime()
+    if runtime is not None:
+        with runtime.lock:
+            runtime.logger_users.add(name)
+        _logger = _new_logger(
+            SHARED_LOG_NAME, directory, dict(options, write_lock=runtime.log_lock)
+        )
+        _shared_logger_user = (runtime, name)
+        futil.set_log_sink(_AddinLogSink(_logger, name))
+        return _logger.path
+
+    _logger = _new_logger(name, directory, options)
+    futil.set_log_sink(_logger)
+    return _logger.path
+
+
+def _new_logger(name: str, directory: str, options: dict) -> BufferedLogger:
+    path = os.path.join(directory or default_log_directory(), f"{name}.log.jsonl")
+    register_custom_event(LOG_SUMMARY_EVENT_ID, _show_log_summary, name="log.summary")
+    return BufferedLogger(
+        path,
+        on_summary=lambda text: app.fireCustomEvent(LOG_SUMMARY_EVENT_ID, text),
+        **options,
+    )
+
+
+def stop_buffered_logging() -> None:
+    """Flush and close the buffered logger and restore direct logging."""
+    global _logger, _shared_logger_user
+    if _logger is None:
+        return
+    futil.set_log_sink(None)
+    logger, _logger = _logger, None
+    if _shared_logger_user is not None:
+        (runtime, name), _shared_logger_user = _shared_logger_user, None
+        with runtime.lock:
+            runtime.logger_users.discard(name)
+    logger.close()
+    unregister_custom_event(LOG_SUMMARY_EVENT_ID)
+    text = logger.summary()
+    if text:
+        app.log(text, adsk.core.LogLevels.InfoLogLevel, adsk.core.LogTypes.ConsoleLogType)
+
+
+# ── Benchmark ─────────────────────────────────────────────────────────────────
+
+
+def benchmark_disabled_logging(iterations: int = 100000) -> dict:
+    """Time log calls with logging disabled, as in a release build.
+
+    Compares an eager `log(f"...")` against `log_lazy()` with a template and a
+    deferred argument. The message reads a property that stands in for a
+    Fusion API call such as `document.name`. Returns
+    {case: {"ns_per_call", "property_reads"}}.
+    """
+
+    class _Document:
+        reads = 0
+
+        @property
+        def name(self):
+            _Document.reads += 1
+            return "Bracket"
+
+    document = _Document()
+    cases = {
+        "eager f-string": lambda: futil.log(f"Share Document finished for {document.name}"),
+        "log_lazy template": lambda: futil.log_lazy(
+            "%s finished for %s", "Share Document", lambda: document.name
+        ),
+        "is_logging_enabled guard": lambda: futil.is_logging_enabled()
+        and futil.log(f"Share Document finished for {document.name}"),
+    }
+
+    debug = futil.DEBUG
+    futil.DEBUG = False
+    results = {}
+    try:
+        for case, call in cases.items():
+            _Document.reads = 0
+            t0 = time.perf_counter()
+            for _ in range(iterations):
+                call()
+            elapsed = time.perf_counter() - t0
+            results[case] = {
+                "ns_per_call": round(elapsed / iterations * 1e9, 1),
+                "property_reads": _Document.reads,
+            }
+    finally:
+        futil.DEBUG = debug
+    return results
@@ -0,0 +1,274 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2022-2026 IMA LLC
+
+"""In-process latency histograms fed by `perf_timer`.
+
+When config.PERF_TRACE is True every `perf_timer(label, context)` block is
+recorded into a histogram keyed by (context, label), so tail latency across
+hundreds of share operations can be read off instead of scrolling [PERF]
+lines. `dump_histograms(path)` writes count/mean/p50/p95/p99/max per key as
+CSV (.csv) or JSON.
+
+Histograms are HDR-style: values are kept in microseconds in log-linear
+buckets, 64 sub-buckets per power of two, so every recorded value is within
+~1.6 % of its bucket bound whatever its magnitude, and memory depends on
+the range of values seen rather than on the number of samples.
+
+Every `perf_timer` block is also recorded as a span with its thread and
+its enclosing span on that thread, so one command can be broken down into
+nested stages. `write_chrome_trace(path)` writes the spans as Chrome Trace
+Event JSON for about:tracing or https://ui.perfetto.dev.
+
+This module does not import adsk.
+"""
+
+import csv
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# 2**(SUB_BUCKET_BITS - 1) sub-buckets per power of two.
+SUB_BUCKET_BITS = 7
+_SUB_BUCKET_HALF = 1 << (SUB_BUCKET_BITS - 1)
+
+# Oldest spans are dropped beyond this many.
+MAX_TRACE_SPANS = 100000
+
+REPORT_FIELDS = [
+    "context",
+    "label",
+    "count",
+    "mean_ms",
+    "p50_ms",
+    "p95_ms",
+    "p99_ms",
+    "max_ms",
+]
+
+
+# ── Histogram ─────────────────────────────────────────────────────────────────
+
+
+def _bucket_index(value: int) -> int:
+    exponent = max(value.bit_length() - SUB_BUCKET_BITS, 0)
+    return exponent * _SUB_BUCKET_HALF + (value >> exponent)
+
+
+def _bucket_upper_bound(index: int) -> int:
+    if index < 2 * _SUB_BUCKET_HALF:
+        return index
+    exponent = index // _SUB_BUCKET_HALF - 1
+    mantissa = index - exponent * _SUB_BUCKET_HALF
+    return ((mantissa + 1) << exponent) - 1
+
+
+class LatencyHistogram:
+    """Log-linear histogram of durations in microseconds."""
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us = None
+        self.max_us = 0
+
+    def record(self, seconds: float) -> None:
+        value = max(int(seconds * 1_000_000), 0)
+        index = _bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total_us += value
+        self.max_us = max(self.max_us, value)
+        self.min_us = value if self.min_us is None else min(self.min_us, value)
+
+    def percentile(self, percent: float) -> int:
+        """Return the value (µs) at or below which *percent* of samples fall."""
+        if not self.count:
+            return 0
+        rank = max(int(self.count * percent / 100.0 + 0.5), 1)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(_bucket_upper_bound(index), self.max_us)
+        return self.max_us
+
+    def summary(self) -> dict:
+        """Return {count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}."""
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_us / self.count / 1000.0, 3) if self.count else 0.0,
+            "p50_ms": self.percentile(50) / 1000.0,
+            "p95_ms": self.percentile(95) / 1000.0,
+            "p99_ms": self.percentile(99) / 1000.0,
+            "max_ms": self.max_us / 1000.0,
+        }
+
+
+# ── Registry ──────────────────────────────────────────────────────────────────
+
+# {(context, label): LatencyHistogram}
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+
+def record_latency(label: str, context: str, seconds: float) -> None:
+    """Add one duration to the (context, label) histogram. Thread safe."""
+    key = (context, label)
+    with _histograms_lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = LatencyHistogram()
+        histogram.record(seconds)
+
+
+def latency_report() -> list[dict]:
+    """Return one REPORT_FIELDS row per (context, label), slowest p99 first."""
+    with _histograms_lock:
+        rows = [
+            {"context": context, "label": label, **histogram.summary()}
+            for (context, label), histogram in _histograms.items()
+        ]
+    rows.sort(key=lambda row: row["p99_ms"], reverse=True)
+    return rows
+
+
+def dump_histograms(path: str) -> str | None:
+    """Write latency_report() to *path* (.csv, otherwise JSON).
+
+    Returns the path, or None when nothing has been recorded.
+    """
+    rows = latency_report()
+    if not rows:
+        return None
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="") as fh:
+        if path.lower().endswith(".csv"):
+            writer = csv.DictWriter(fh, fieldnames=REPORT_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+        else:
+            json.dump(rows, fh, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def reset_histograms() -> None:
+    """Forget every recorded duration."""
+    with _histograms_lock:
+        _histograms.clear()
+
+
+# ── Span tracing ──────────────────────────────────────────────────────────────
+
+# (label, context, start, duration, thread id, thread name, span id, parent id, args)
+_spans = deque(maxlen=MAX_TRACE_SPANS)
+_span_ids = itertools.count(1)
+_span_stacks = threading.local()
+_trace_origin = time.perf_counter()
+
+
+def _span_stack() -> list:
+    stack = getattr(_span_stacks, "stack", None)
+    if stack is None:
+        stack = _span_stacks.stack = []
+    return stack
+
+
+def begin_span() -> tuple[int, int | None]:
+    """Open a span on the current thread. Returns (span id, parent span id)."""
+    stack = _span_stack()
+    span_id = next(_span_ids)
+    parent_id = stack[-1] if stack else None
+    stack.append(span_id)
+    return span_id, parent_id
+
+
+def end_span(
+    token: tuple, label: str, context: str, start: float, duration: float, args=None
+) -> None:
+    """Close the span *token* from begin_span() and record it.
+
+    *start* is a time.perf_counter() value and *duration* is in seconds.
+    """
+    span_id, parent_id = token
+    stack = _span_stack()
+    if span_id in stack:
+        del stack[stack.index(span_id) :]
+    thread = threading.current_thread()
+    _spans.append(
+        (
+            label,
+            context,
+            start,
+            duration,
+            threading.get_native_id(),
+            thread.name,
+            span_id,
+            parent_id,
+            args,
+        )
+    )
+
+
+def chrome_trace_events() -> list[dict]:
+    """Return the recorded spans as Chrome Trace Event dicts."""
+    pid = os.getpid()
+    events = []
+    thread_names = {}
+    for span in list(_spans):
+        label, context, start, duration, tid, thread_name, span_id, parent_id, args = span
+        thread_names[tid] = thread_name
+        event_args = {"context": context, "id": span_id}
+        if parent_id is not None:
+            event_args["parent"] = parent_id
+        if args:
+            event_args.update({key: str(value) for key, value in args.items()})
+        events.append(
+            {
+                "name": label,
+                "cat": context.partition(".")[0] or "perf",
+                "ph": "X",
+                "ts": round((start - _trace_origin) * 1_000_000, 3),
+                "dur": round(duration * 1_000_000, 3),
+                "pid": pid,
+                "tid": tid,
+                "args": event_args,
+            }
+        )
+    for tid, thread_name in thread_names.items():
+        events.append(
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": tid,
+                "args": {"name": thread_name},
+            }
+        )
+    return events
+
+
+def write_chrome_trace(path: str) -> str | None:
+    """Write the recorded spans to *path* as Chrome Trace Event JSON.
+
+    Returns the path, or None when no span has been recorded.
+    """
+    events = chrome_trace_events()
+    if not events:
+        return None
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, fh)
+    os.replace(tmp_path, path)
+    return path
+
+
+def clear_trace() -> None:
+    """Forget every recorded span."""
+    _spans.clear()
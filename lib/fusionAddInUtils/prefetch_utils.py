@@ -0,0 +1,146 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2022-2026 IMA LLC
+
+"""Warm share state, hub URL and reference scan when a document is activated.
+
+Users tend to open the Share Menu right after switching documents. After
+`start_prefetch()`, `documentActivated`/`documentOpened` events are debounced
+(opening an assembly fires a burst of them) and the last document of each
+burst is prefetched through a custom event, so the work runs once Fusion is
+idle instead of delaying the activation itself. The prefetch:
+
+  1. reads the live share state into the share_utils cache (if not cached),
+  2. resolves the hub prefix and project root used by link_utils, and
+  3. advances the external-reference scan in short slices, re-queuing itself
+     until the scan finishes or another document takes over.
+
+All Fusion API calls stay on the UI thread; "background" here means "in idle
+time between user actions".
+"""
+
+import adsk.core
+
+from .coalesce_utils import add_coalesced_handler
+from .event_utils import register_custom_event, unregister_custom_event
+from .link_utils import hub_url_prefix_for_file
+from .reference_utils import SCAN_UNKNOWN, document_has_external_references
+from .share_utils import (
+    find_open_document,
+    read_live_share_state,
+    read_share_state_cache,
+    write_share_state_cache,
+)
+from . import general_utils as futil
+
+app = adsk.core.Application.get()
+
+PREFETCH_EVENT_ID = futil.custom_event_id("prefetchDocument")
+
+# Reference-scan time per idle slice; short enough not to be felt as lag.
+PREFETCH_SCAN_SLICE_SECONDS = 0.1
+
+# Activation events closer together than this are one burst.
+PREFETCH_COALESCE_SECONDS = 0.3
+
+# ── Prefetch ──────────────────────────────────────────────────────────────────
+
+
+def _is_active(document) -> bool:
+    try:
+        return app.activeDocument == document
+    except Exception:
+        return False
+
+
+def prefetch_document(document) -> bool:
+    """Warm the caches for *document*. Returns True when nothing is left to do.
+
+    Each call runs at most one reference-scan slice; call again while it
+    returns False.
+    """
+    data_file = document.dataFile
+    if data_file is None:
+        return True
+
+    with futil.perf_timer("share state", "prefetch"):
+        if read_share_state_cache(data_file) is None:
+            write_share_state_cache(data_file, read_live_share_state(data_file))
+
+    with futil.perf_timer("hub and project urls", "prefetch"):
+        hub_url_prefix_for_file(data_file)
+
+    if document.isModified:
+        # Scans of modified documents are not cached, so there is nothing to warm.
+        return True
+    result = document_has_external_references(
+        document,
+        "prefetch",
+        budget_seconds=PREFETCH_SCAN_SLICE_SECONDS,
+        show_progress=False,
+    )
+    return result is not SCAN_UNKNOWN
+
+
+def queue_prefetch(document) -> None:
+    """Queue a prefetch for a saved *document* to run when Fusion is idle."""
+    try:
+        data_file = document.dataFile
+    except Exception:
+        return
+    if data_file is None:
+        return
+    app.fireCustomEvent(PREFETCH_EVENT_ID, data_file.id)
+
+
+def _activated_data_file_id(args: adsk.core.DocumentEventArgs) -> str | None:
+    try:
+        data_file = args.document.dataFile
+    except Exception:
+        return None
+    return data_file.id if data_file else None
+
+
+def _prefetch_activated(data_file_id: str):
+    app.fireCustomEvent(PREFETCH_EVENT_ID, data_file_id)
+
+
+def _run_prefetch(args: adsk.core.CustomEventArgs):
+    document = find_open_document(args.additionalInfo)
+    if document is None:
+        return
+    if prefetch_document(document):
+        futil.log_lazy("prefetch: %s warmed", lambda: document.name)
+        return
+    # The reference scan is unfinished; continue while this document is active.
+    if _is_active(document):
+        app.fireCustomEvent(PREFETCH_EVENT_ID, args.additionalInfo)
+
+
+def start_prefetch() -> None:
+    """Prefetch share data for each document as it is activated or opened."""
+    register_custom_event(PREFETCH_EVENT_ID, _run_prefetch, name="prefetch.run")
+    # Both events share one burst key so only the last document is prefetched.
+    for event, name in (
+        (app.documentActivated, "prefetch.activated"),
+        (app.documentOpened, "prefetch.opened"),
+    ):
+        add_coalesced_handler(
+            event,
+            _prefetch_activated,
+            window_seconds=PREFETCH_COALESCE_SECONDS,
+            key=lambda args: "prefetch",
+            payload=_activated_data_file_id,
+            name=name,
+        )
+
+    # The document that is already open when the add-in starts gets no event.
+    try:
+        if app.activeDocument:
+            queue_prefetch(app.activeDocument)
+    except Exception:
+        pass
+
+
+def stop_prefetch() -> None:
+    """Unregister the prefetch event."""
+    unregister_custom_event(PREFETCH_EVENT_ID)
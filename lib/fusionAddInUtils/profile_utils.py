@@ -0,0 +1,135 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2022-2026 IMA LLC
+
+"""Opt-in cProfile / tracemalloc capture around event handlers.
+
+When config.PROFILE_HANDLERS or config.PROFILE_MEMORY is True, every
+command handler created by `event_utils.add_handler()` runs through
+`profile_call()`, which writes one file per call that users can send back
+with a slow-share report. Handlers whose callback is defined in this
+package (prefetch slices, log summaries, executor drains, coalesced
+dispatch, cache upkeep) are not captured: they fire far more often than
+any command and would prune its captures.
+
+Profile files (written under add-in/cache/profiles/):
+  <handler>_<timestamp>.prof        — cProfile stats (PROFILE_HANDLERS);
+                                      open with `python -m pstats` or snakeviz
+  <handler>_<timestamp>_alloc.txt   — top allocations made during the call,
+                                      by source line (PROFILE_MEMORY)
+
+<handler> is the command folder and callback, e.g.
+`shareDocument.command_execute`. Only the oldest files beyond
+MAX_PROFILE_FILES are deleted.
+"""
+
+import cProfile
+import os
+import threading
+import time
+import tracemalloc
+
+from .cache_utils import CACHE_FOLDER
+from .general_utils import PROFILE_HANDLERS, PROFILE_MEMORY
+from . import general_utils as futil
+
+PROFILE_FOLDER = os.path.join(CACHE_FOLDER, "profiles")
+
+# Keep at most this many capture files in PROFILE_FOLDER.
+MAX_PROFILE_FILES = 200
+
+# Number of allocation sites listed per tracemalloc snapshot.
+TOP_ALLOCATIONS = 25
+
+# Frames kept per allocation traceback while tracemalloc is tracing.
+TRACEMALLOC_FRAMES = 10
+
+# Handlers that fire while another is being profiled (e.g. a doEvents() inside
+# command_execute) run unprofiled; cProfile cannot nest.
+_active = threading.local()
+
+
+def is_profiling_enabled() -> bool:
+    """Return True when handlers are run through profile_call()."""
+    return PROFILE_HANDLERS or PROFILE_MEMORY
+
+
+def is_profiled(callback) -> bool:
+    """Return True when handler calls to *callback* are captured.
+
+    Only callbacks defined outside this package (the command modules) are.
+    """
+    module = getattr(callback, "__module__", "") or ""
+    return is_profiling_enabled() and not module.startswith(f"{__package__}.")
+
+
+def _capture_path(label: str, suffix: str) -> str:
+    stamp = time.strftime("%Y%m%d-%H%M%S") + f"-{int(time.time() * 1000) % 1000:03d}"
+    return os.path.join(PROFILE_FOLDER, f"{label}_{stamp}{suffix}")
+
+
+def _prune_captures() -> None:
+    try:
+        paths = [os.path.join(PROFILE_FOLDER, name) for name in os.listdir(PROFILE_FOLDER)]
+    except OSError:
+        return
+    if len(paths) <= MAX_PROFILE_FILES:
+        return
+    paths.sort(key=os.path.getmtime)
+    for path in paths[: len(paths) - MAX_PROFILE_FILES]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _write_allocations(path: str, label: str, before, after, seconds: float) -> None:
+    stats = after.compare_to(before, "lineno")
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write(f"{label}: {seconds:.3f} s, top {TOP_ALLOCATIONS} allocation sites\n\n")
+        for stat in stats[:TOP_ALLOCATIONS]:
+            fh.write(f"{stat}\n")
+
+
+def profile_call(label: str, callback, args) -> None:
+    """Run `callback(args)` under cProfile and/or tracemalloc and save the results.
+
+    Exceptions from the callback propagate after the captures are written.
+    """
+    if getattr(_active, "running", False):
+        callback(args)
+        return
+
+    _active.running = True
+    profiler = cProfile.Profile() if PROFILE_HANDLERS else None
+    started_tracing = False
+    before = None
+    if PROFILE_MEMORY:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            started_tracing = True
+        before = tracemalloc.take_snapshot()
+
+    t0 = time.perf_counter()
+    try:
+        if profiler is not None:
+            profiler.runcall(callback, args)
+        else:
+            callback(args)
+    finally:
+        elapsed = time.perf_counter() - t0
+        after = tracemalloc.take_snapshot() if before is not None else None
+        if started_tracing:
+            tracemalloc.stop()
+        _active.running = False
+
+        try:
+            os.makedirs(PROFILE_FOLDER, exist_ok=True)
+            if profiler is not None:
+                profiler.dump_stats(_capture_path(label, ".prof"))
+            if after is not None:
+                _write_allocations(
+                    _capture_path(label, "_alloc.txt"), label, before, after, elapsed
+                )
+            _prune_captures()
+        except Exception:
+            futil.log("profile capture: failed to write — ignoring")
@@ -0,0 +1,222 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2022-2026 IMA LLC
+
+"""Persistent project-wide document reference graph for share-impact analysis.
+
+Sharing a top-level assembly also exposes every document it references,
+directly or through sub-assemblies. This module keeps a graph of "document
+X (version n) references documents Y, Z" per project so the share commands
+can list the transitively exposed documents without opening any child.
+
+Cache files (written under add-in/cache/, next to the cache_utils files):
+  ref_graph_<project-key>.json — {data-file id: {name, version, children}}
+                                  where each child is {id, version, name,
+                                  project}; `project` is the project key of
+                                  the child's own graph
+
+The graph is updated incrementally: `record_document(document)` reads the
+already-loaded `document.documentReferences` of a saved or opened document
+and replaces that one node. Call `start_reference_graph()` once at add-in
+start to record documents as they are opened and saved.
+"""
+
+import json
+import os
+from collections import deque
+
+import adsk.core
+
+from .cache_utils import CACHE_FOLDER, project_cache_key
+from .event_utils import add_handler
+from . import general_utils as futil
+
+app = adsk.core.Application.get()
+
+GRAPH_FORMAT_VERSION = 1
+
+# {project_key: {"projectName": str, "nodes": {file_id: node}}}
+_graphs = {}
+
+
+# ── Paths and persistence ─────────────────────────────────────────────────────
+
+
+def reference_graph_cache_path(project) -> str:
+    """Return the JSON path used to persist *project*'s reference graph."""
+    return _graph_path(project_cache_key(project))
+
+
+def _graph_path(key: str) -> str:
+    return os.path.join(CACHE_FOLDER, f"ref_graph_{key}.json")
+
+
+def _load_graph(project) -> dict:
+    """Return the in-memory graph for *project*, reading the cache file once."""
+    graph = _load_graph_by_key(project_cache_key(project))
+    graph["projectName"] = project.name
+    return graph
+
+
+def _load_graph_by_key(key: str) -> dict:
+    """Return the in-memory graph stored under project key *key*."""
+    graph = _graphs.get(key)
+    if graph is not None:
+        return graph
+
+    graph = {"projectName": "", "nodes": {}}
+    path = _graph_path(key)
+    if os.path.exists(path):
+        try:
+            with open(path, encoding="utf-8") as fh:
+                payload = json.load(fh)
+            if payload.get("formatVersion") == GRAPH_FORMAT_VERSION:
+                graph["projectName"] = payload.get("projectName", "")
+                graph["nodes"] = payload.get("nodes", {})
+        except Exception:
+            futil.log("reference graph: failed to read cache — ignoring")
+    _graphs[key] = graph
+    return graph
+
+
+def _write_graph(project, graph: dict) -> None:
+    payload = {
+        "formatVersion": GRAPH_FORMAT_VERSION,
+        "projectName": graph["projectName"],
+        "projectKey": project_cache_key(project),
+        "nodes": graph["nodes"],
+    }
+    path = reference_graph_cache_path(project)
+    try:
+        os.makedirs(CACHE_FOLDER, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh)
+        os.replace(tmp_path, path)
+    except Exception:
+        futil.log("reference graph: failed to write cache — ignoring")
+
+
+# ── Incremental updates ───────────────────────────────────────────────────────
+
+
+def _direct_references(document) -> list[dict]:
+    """Return [{id, version, name, project}] for the documents *document* references."""
+    children = []
+    seen = set()
+    for reference in document.documentReferences:
+        try:
+            data_file = reference.dataFile
+            if data_file is None or data_file.id in seen:
+                continue
+            seen.add(data_file.id)
+            children.append(
+                {
+                    "id": data_file.id,
+                    "version": reference.version,
+                    "name": data_file.name,
+                    "project": project_cache_key(data_file.parentProject),
+                }
+            )
+        except Exception:
+            futil.log("reference graph: skipped unreadable document reference")
+    return children
+
+
+def record_document(document, cmd_name: str = "") -> dict | None:
+    """Replace the graph node for a saved *document* and persist the graph.
+
+    Returns the recorded node, or None when the document is not saved to a
+    project. Only `documentReferences` is read; no child is opened.
+    """
+    try:
+        data_file = document.dataFile
+        if data_file is None:
+            return None
+        project = data_file.parentProject
+    except Exception:
+        return None
+
+    with futil.perf_timer("record_document", f"{cmd_name}.reference_graph"):
+        node = {
+            "name": data_file.name,
+            "version": data_file.versionNumber,
+            "children": _direct_references(document),
+        }
+        graph = _load_graph(project)
+        if graph["nodes"].get(data_file.id) != node:
+            graph["nodes"][data_file.id] = node
+            _write_graph(project, graph)
+    return node
+
+
+def forget_project_graph(project) -> None:
+    """Delete the cached graph for *project* from memory and disk."""
+    _graphs.pop(project_cache_key(project), None)
+    try:
+        os.remove(reference_graph_cache_path(project))
+    except FileNotFoundError:
+        pass
+    except Exception:
+        futil.log("reference graph: failed to delete cache — ignoring")
+
+
+# ── Queries ───────────────────────────────────────────────────────────────────
+
+
+def exposed_documents(document, cmd_name: str = "") -> tuple[list[dict], int]:
+    """Return (documents, unindexed) exposed by sharing *document*.
+
+    `documents` lists every transitively referenced document as
+    {id, version, name}, nearest first. Direct references always come from
+    the live document; deeper levels come from the persisted graph.
+    `unindexed` counts referenced documents whose own references are not in
+    the graph yet, so the list may be incomplete below them. A child in
+    another project is looked up in that project's graph.
+    """
+    node = record_document(document, cmd_name)
+    if node is None:
+        return [], 0
+
+    root_key = project_cache_key(document.dataFile.parentProject)
+    root_id = document.dataFile.id
+
+    exposed = []
+    unindexed = 0
+    seen = {root_id}
+    # (child, project key of the graph that recorded the edge)
+    queue = deque((child, root_key) for child in node["children"])
+    with futil.perf_timer("transitive closure", f"{cmd_name}.reference_graph"):
+        while queue:
+            child, parent_key = queue.popleft()
+            if child["id"] in seen:
+                continue
+            seen.add(child["id"])
+            exposed.append(child)
+
+            # Edges recorded before children carried a project key stay in
+            # their parent's project.
+            key = child.get("project") or parent_key
+            child_node = _load_graph_by_key(key)["nodes"].get(child["id"])
+            if child_node is None or child_node.get("version") != child.get("version"):
+                unindexed += 1
+                continue
+            queue.extend((grandchild, key) for grandchild in child_node["children"])
+    return exposed, unindexed
+
+
+# ── Event wiring ──────────────────────────────────────────────────────────────
+
+
+def _document_saved_or_opened(args: adsk.core.DocumentEventArgs):
+    record_document(args.document, "reference_graph")
+
+
+def start_reference_graph() -> None:
+    """Record documents into the graph as they are opened and saved."""
+    add_handler(app.documentSaved, _document_saved_or_opened, name="reference_graph.saved")
+    add_handler(app.documentOpened, _document_saved_or_opened, name="reference_graph.opened")
+
+
+def stop_reference_graph() -> None:
+    """Drop the in-memory graphs. Handlers are released by clear_handlers()."""
+    _graphs.clear()
@@ -0,0 +1,257 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2022-2026 IMA LLC
+
+"""Session-scoped external-reference index shared by the share commands.
+
+`has_external_child_reference(component)` answers "does this design pull in
+any externally referenced component?". Assemblies reuse the same component
+under many occurrences, so the walk follows `component.occurrences` but visits
+each unique component only once (the occurrence tree is treated as a DAG).
+
+The walk is driven by `ReferenceScan`, an explicit-stack traversal that never
+recurses (deep nests cannot hit Python's recursion limit). `run()` accepts a
+time budget and pumps `adsk.doEvents()` between chunks so Fusion stays
+responsive; when the budget runs out, or the user cancels the progress
+dialog, it returns `SCAN_UNKNOWN` and the scan can be resumed later from where
+it stopped.
+
+`document_has_external_references(document)` caches the answer, or the
+unfinished scan, per document/version for the rest of the session. Call
+`start_reference_index()` once at add-in start so saved and closed documents
+drop their cached entries; modified (unsaved) documents always bypass the
+cache because their occurrence tree may no longer match the saved version.
+"""
+
+import time
+
+import adsk.core
+import adsk.fusion
+
+from .event_utils import add_handler
+from . import general_utils as futil
+
+app = adsk.core.Application.get()
+
+# Returned instead of True/False while a scan has not finished.
+SCAN_UNKNOWN = None
+
+DEFAULT_SCAN_BUDGET_SECONDS = 2.0
+DEFAULT_SCAN_CHUNK_SIZE = 200
+# Seconds before the progress dialog appears; short scans never show it.
+DEFAULT_PROGRESS_DELAY_SECONDS = 1
+
+# {(data_file_id, version_number): bool | ReferenceScan}
+_reference_index = {}
+
+
+# ── Key helpers ───────────────────────────────────────────────────────────────
+
+
+def _component_key(component) -> str:
+    """Return a key that identifies *component* across its occurrences."""
+    try:
+        return component.id
+    except Exception:
+        return str(id(component))
+
+
+def document_cache_key(document) -> tuple | None:
+    """Return (data_file_id, version_number) for a saved document, or None."""
+    try:
+        data_file = document.dataFile
+        if data_file is None:
+            return None
+        return (data_file.id, data_file.versionNumber)
+    except Exception:
+        return None
+
+
+# ── Traversal ─────────────────────────────────────────────────────────────────
+
+
+class ReferenceScan:
+    """Resumable, explicit-stack search for referenced occurrences.
+
+    The stack holds `(occurrences, next_index, count)` frames, so a scan can
+    stop between any two occurrences and pick up again on the next `run()`.
+    """
+
+    def __init__(self, root_component: adsk.fusion.Component):
+        root_occurrences = root_component.occurrences
+        self._stack = [(root_occurrences, 0, root_occurrences.count)]
+        self._visited = {_component_key(root_component)}
+        self.result = SCAN_UNKNOWN
+        self.occurrences_checked = 0
+        self.was_cancelled = False
+
+    @property
+    def is_done(self) -> bool:
+        return self.result is not SCAN_UNKNOWN
+
+    @property
+    def components_visited(self) -> int:
+        return len(self._visited)
+
+    def run(
+        self,
+        budget_seconds: float | None = None,
+        *,
+        chunk_size: int = DEFAULT_SCAN_CHUNK_SIZE,
+        progress: adsk.core.ProgressDialog = None,
+    ) -> bool | None:
+        """Advance the scan and return True, False or SCAN_UNKNOWN.
+
+        `budget_seconds` of None runs to completion. Every `chunk_size`
+        occurrences the scan pumps `adsk.doEvents()`, checks
+        `progress.wasCancelled` and the budget, and updates the dialog text.
+        """
+        if self.is_done:
+            return self.result
+
+        self.was_cancelled = False
+        deadline = None if budget_seconds is None else time.perf_counter() + budget_seconds
+        chunk_size = max(1, chunk_size)
+        steps = 0
+        stack = self._stack
+        visited = self._visited
+
+        while stack:
+            occurrences, index, count = stack[-1]
+            if index >= count:
+                stack.pop()
+                continue
+            stack[-1] = (occurrences, index + 1, count)
+
+            occurrence = occurrences.item(index)
+            self.occurrences_checked += 1
+            if occurrence.isReferencedComponent:
+                stack.clear()
+                self.result = True
+                return True
+
+            component = occurrence.component
+            key = _component_key(component)
+            if key not in visited:
+                visited.add(key)
+                child_occurrences = component.occurrences
+                stack.append((child_occurrences, 0, child_occurrences.count))
+
+            steps += 1
+            if steps % chunk_size == 0:
+                adsk.doEvents()
+                if progress is not None:
+                    if progress.wasCancelled:
+                        self.was_cancelled = True
+                        return SCAN_UNKNOWN
+                    progress.message = (
+                        f"Checking for external references... "
+                        f"{self.components_visited} components scanned"
+                    )
+                if deadline is not None and time.perf_counter() >= deadline:
+                    return SCAN_UNKNOWN
+
+        self.result = False
+        return False
+
+
+def has_external_child_reference(component: adsk.fusion.Component) -> bool:
+    """Return True when any occurrence below *component* is a referenced component.
+
+    Each unique component is expanded at most once, so heavily reused parts
+    cost one visit no matter how many occurrences point at them.
+    """
+    return ReferenceScan(component).run()
+
+
+# ── Session index ─────────────────────────────────────────────────────────────
+
+
+def document_has_external_references(
+    document,
+    cmd_name: str = "",
+    *,
+    budget_seconds: float | None = DEFAULT_SCAN_BUDGET_SECONDS,
+    show_progress: bool = True,
+) -> bool | None:
+    """Return the cached external-reference answer for *document*.
+
+    Runs (or resumes) the scan for at most `budget_seconds`. Returns
+    SCAN_UNKNOWN when the scan is still unfinished; the partial scan is kept
+    so the next call continues from where this one stopped. With
+    `show_progress`, a cancellable progress dialog appears if the scan takes
+    longer than DEFAULT_PROGRESS_DELAY_SECONDS. Non-design documents have no
+    occurrences and always return False.
+    """
+    product = document.products.itemByProductType("DesignProductType")
+    design = adsk.fusion.Design.cast(product)
+    if design is None:
+        return False
+
+    key = document_cache_key(document)
+    cacheable = key is not None and not document.isModified
+    cached = _reference_index.get(key) if cacheable else None
+    if isinstance(cached, bool):
+        futil.log_lazy("%s: reference index hit for %s v%s", cmd_name, key[0], key[1])
+        return cached
+
+    scan = cached if isinstance(cached, ReferenceScan) else ReferenceScan(design.rootComponent)
+
+    progress = None
+    if show_progress:
+        progress = futil.ui.createProgressDialog()
+        progress.isCancelButtonShown = True
+        progress.cancelButtonText = "Skip"
+        progress.show(
+            cmd_name or "External References",
+            "Checking for external references...",
+            0,
+            0,
+            DEFAULT_PROGRESS_DELAY_SECONDS,
+        )
+    try:
+        with futil.perf_timer("ReferenceScan.run", f"{cmd_name}.reference_index"):
+            result = scan.run(budget_seconds, progress=progress)
+    finally:
+        if progress is not None:
+            progress.hide()
+
+    if result is SCAN_UNKNOWN:
+        futil.log_lazy(
+            "%s: reference scan unfinished (components=%s, cancelled=%s)",
+            cmd_name,
+            scan.components_visited,
+            scan.was_cancelled,
+        )
+    if cacheable:
+        _reference_index[key] = scan if result is SCAN_UNKNOWN else result
+    return result
+
+
+def invalidate_reference_index(document=None) -> None:
+    """Drop cached entries for *document*, or the whole index when None."""
+    if document is None:
+        _reference_index.clear()
+        return
+    try:
+        data_file_id = document.dataFile.id if document.dataFile else None
+    except Exception:
+        data_file_id = None
+    if data_file_id is None:
+        return
+    for key in [k for k in _reference_index if k[0] == data_file_id]:
+        del _reference_index[key]
+
+
+def _document_changed(args: adsk.core.DocumentEventArgs):
+    invalidate_reference_index(args.document)
+
+
+def start_reference_index() -> None:
+    """Connect document saved/closed events so stale entries are dropped."""
+    add_handler(app.documentSaved, _document_changed, name="reference_index.saved")
+    add_handler(app.documentClosed, _document_changed, name="reference_index.closed")
+
+
+def stop_reference_index() -> None:
+    """Forget every cached entry. Handlers are released by clear_handlers()."""
+    invalidate_reference_index()
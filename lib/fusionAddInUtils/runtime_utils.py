@@ -0,0 +1,151 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2022-2026 IMA LLC
+
+"""Opt-in runtime shared by every PowerTools add-in in the Fusion process.
+
+Each add-in vendors its own copy of this package, so by default every add-in
+keeps its own hub URL lookups, Global Parameters folder lookups and log
+writer thread in the same interpreter. An add-in that calls
+`attach_runtime(name)` (config.SHARED_RUNTIME) joins a single runtime object
+registered in `sys.modules` under RUNTIME_MODULE_NAME:
+
+  - the caches listed in SHARED_CACHES are replaced by the runtime's dicts,
+    so a hub prefix or folder id resolved by one add-in is reused by all;
+  - `start_buffered_logging()` writes SHARED_LOG_NAME.log.jsonl, each
+    record tagged with its add-in.
+
+The runtime only holds plain data and locks, never an object or callback
+from one add-in's copy of the package, so any add-in can stop first.
+
+The runtime carries RUNTIME_VERSION. An add-in whose copy of this package
+has a different version stays private, so mismatched vendored copies never
+share data whose layout they disagree on. The runtime is removed from
+`sys.modules` when the last add-in detaches.
+"""
+
+import importlib
+import sys
+import threading
+import types
+
+import adsk.core
+
+from . import general_utils as futil
+
+RUNTIME_MODULE_NAME = "powertools_shared_runtime"
+
+# Bump when the layout of the runtime or of any shared cache changes.
+RUNTIME_VERSION = 1
+
+# Base name of the log file written by attached add-ins.
+SHARED_LOG_NAME = "PowerTools"
+
+# (submodule, module attribute, runtime cache key) for every in-memory cache
+# whose contents are the same whichever add-in filled it.
+SHARED_CACHES = (
+    ("link_utils", "_hub_prefixes", "link_utils.hub_prefixes"),
+    ("link_utils", "_project_roots", "link_utils.project_roots"),
+    ("link_utils", "_file_owners", "link_utils.file_owners"),
+    ("cache_utils", "_global_params_folders", "cache_utils.global_params_folders"),
+)
+
+_creation_lock = threading.Lock()
+
+# The runtime this copy of the package is attached to, and as which add-in.
+_runtime = None
+_addin_name = None
+
+
+def _create_runtime() -> types.ModuleType:
+    runtime = types.ModuleType(RUNTIME_MODULE_NAME, "Shared PowerTools runtime")
+    runtime.version = RUNTIME_VERSION
+    runtime.lock = threading.RLock()
+    runtime.addins = set()
+    # {cache key: dict}
+    runtime.caches = {}
+    # Taken by every BufferedLogger writing the shared log file, and the
+    # add-ins doing so.
+    runtime.log_lock = threading.Lock()
+    runtime.logger_users = set()
+    return runtime
+
+
+def attach_runtime(addin_name: str) -> bool:
+    """Join (or create) the shared runtime as *addin_name*.
+
+    Call at add-in start, before any shared cache is used. Returns False and
+    keeps the add-in private when the registered runtime has another version.
+    """
+    global _runtime, _addin_name
+    if _runtime is not None:
+        return True
+    with _creation_lock:
+        runtime = sys.modules.get(RUNTIME_MODULE_NAME)
+        if runtime is None:
+            runtime = sys.modules[RUNTIME_MODULE_NAME] = _create_runtime()
+    if getattr(runtime, "version", None) != RUNTIME_VERSION:
+        futil.log(
+            f"{addin_name}: shared runtime version {getattr(runtime, 'version', None)} "
+            f"does not match {RUNTIME_VERSION}; using private caches",
+            adsk.core.LogLevels.WarningLogLevel,
+        )
+        return False
+
+    with runtime.lock:
+        runtime.addins.add(addin_name)
+        for submodule, attribute, key in SHARED_CACHES:
+            module = importlib.import_module(f".{submodule}", __package__)
+            shared = runtime.caches.setdefault(key, {})
+            shared.update(getattr(module, attribute))
+            setattr(module, attribute, shared)
+    _runtime, _addin_name = runtime, addin_name
+    futil.log_lazy(
+        "%s: attached to shared runtime v%s with %s",
+        addin_name,
+        RUNTIME_VERSION,
+        lambda: sorted(runtime.addins),
+    )
+    return True
+
+
+def detach_runtime() -> None:
+    """Leave the shared runtime; this add-in's caches become private and empty.
+
+    Call at add-in stop, before clearing any shared cache, so the other
+    add-ins keep their entries.
+    """
+    global _runtime, _addin_name
+    runtime = _runtime
+    if runtime is None:
+        return
+    with runtime.lock:
+        for submodule, attribute, _key in SHARED_CACHES:
+            module = sys.modules.get(f"{__package__}.{submodule}")
+            if module is not None:
+                setattr(module, attribute, {})
+        runtime.addins.discard(_addin_name)
+        if not runtime.addins:
+            runtime.caches.clear()
+            if sys.modules.get(RUNTIME_MODULE_NAME) is runtime:
+                del sys.modules[RUNTIME_MODULE_NAME]
+    futil.log_lazy("%s: detached from shared runtime", _addin_name)
+    _runtime, _addin_name = None, None
+
+
+def shared_runtime() -> types.ModuleType | None:
+    """Return the runtime this add-in is attached to, or None."""
+    return _runtime
+
+
+def runtime_info() -> dict:
+    """Return {"version", "addins", "caches": {key: entries}, "logger"} or {}."""
+    runtime = _runtime
+    if runtime is None:
+        return {}
+    with runtime.lock:
+        return {
+            "version": runtime.version,
+            "addins": sorted(runtime.addins),
+            "caches": {key: len(cache) for key, cache in runtime.caches.items()},
+            "logger": sorted(runtime.logger_users),
+        }
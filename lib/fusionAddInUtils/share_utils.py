@@ -0,0 +1,613 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2022-2026 IMA LLC
+
+"""Share-link helpers for single documents and whole Hub folders.
+
+`read_share_state_cache(data_file)` returns the last known share state of a
+data-file version without any cloud round trip. Commands serve the clipboard
+copy from it and call `schedule_share_state_revalidation(data_file)`, which
+re-reads the live `sharedLink` on the UI thread once the command has
+finished and warns the user if the copied link is no longer valid.
+
+`start_share_job(document, on_complete)` shares a document without holding
+the command open: the command returns at once, the `isShared` setter runs on
+the UI thread in idle time (custom event), the clipboard copy runs on the
+executor_utils worker pool, and its completion calls `on_complete` back on
+the UI thread.
+
+`batch_share_folder(folder, output_path, ...)` walks `DataFolder.dataFiles`
+(optionally through sub-folders), turns on `dataFile.sharedLink.isShared` for
+each file and streams one result row per file to CSV or JSON Lines as soon as
+it completes. Fusion API calls must stay on the UI thread, so work is bounded
+by `batch_size`: after every batch the output is flushed, the checkpoint is
+written and `adsk.doEvents()` lets Fusion repaint and process cancel clicks.
+
+Cache files (written under add-in/cache/, next to the cache_utils files):
+  share_state_<safe-doc-id>.json — last known share state for one data file,
+                                    tagged with the version it was read at
+  batch_share_<folder-key>.json — checkpoint for an unfinished batch run:
+                                   output path and completed data-file ids
+"""
+
+import csv
+import itertools
+import json
+import os
+import re
+import time
+
+import adsk.core
+
+from .cache_utils import CACHE_FOLDER
+from .event_utils import register_custom_event, unregister_custom_event
+from . import general_utils as futil
+
+app = adsk.core.Application.get()
+
+DEFAULT_BATCH_SIZE = 10
+
+SHARE_STATE_REVALIDATE_EVENT_ID = futil.custom_event_id("shareStateRevalidate")
+SHARE_JOB_START_EVENT_ID = futil.custom_event_id("shareJobStart")
+
+# Keys stored for each cached share state.
+SHARE_STATE_FIELDS = [
+    "isShared",
+    "linkURL",
+    "isDownloadAllowed",
+    "isPasswordRequired",
+]
+
+# {data_file_id: cached payload}; mirrors the share_state_*.json files.
+_share_states = {}
+
+# {job_id: {"dataFileId", "onComplete", "cmdName", "shareState", "wasShared", "error"}}
+_share_jobs = {}
+_share_job_ids = itertools.count(1)
+
+# Column order for CSV output; JSON Lines rows use the same keys.
+SHARE_RESULT_FIELDS = [
+    "name",
+    "id",
+    "version",
+    "folder",
+    "linkURL",
+    "wasShared",
+    "isDownloadAllowed",
+    "isPasswordRequired",
+    "error",
+]
+
+
+# ── Folder walking ────────────────────────────────────────────────────────────
+
+
+def iter_folder_data_files(folder, recursive: bool = True, folder_path: str = ""):
+    """Yield (folder_path, DataFile) for *folder*, depth-first when *recursive*.
+
+    Items are fetched one at a time through `item(i)` so very large folders
+    never materialise as a list.
+    """
+    folder_path = folder_path or folder.name
+    data_files = folder.dataFiles
+    for i in range(data_files.count):
+        yield folder_path, data_files.item(i)
+
+    if not recursive:
+        return
+    data_folders = folder.dataFolders
+    for i in range(data_folders.count):
+        sub_folder = data_folders.item(i)
+        yield from iter_folder_data_files(
+            sub_folder, True, f"{folder_path}/{sub_folder.name}"
+        )
+
+
+def iter_folders(folder):
+    """Yield (folder_path, DataFolder) for *folder* and every sub-folder, pre-order.
+
+    The explicit stack holds one `(dataFolders, next_index, count, path)`
+    frame per level, so memory grows with tree depth, not with folder count.
+    """
+    yield folder.name, folder
+    sub_folders = folder.dataFolders
+    stack = [(sub_folders, 0, sub_folders.count, folder.name)]
+    while stack:
+        sub_folders, index, count, parent_path = stack[-1]
+        if index >= count:
+            stack.pop()
+            continue
+        stack[-1] = (sub_folders, index + 1, count, parent_path)
+        sub_folder = sub_folders.item(index)
+        path = f"{parent_path}/{sub_folder.name}"
+        yield path, sub_folder
+        children = sub_folder.dataFolders
+        stack.append((children, 0, children.count, path))
+
+
+def count_folder_data_files(folder, recursive: bool = True) -> int:
+    """Return the number of data files `iter_folder_data_files` will yield."""
+    total = folder.dataFiles.count
+    if recursive:
+        data_folders = folder.dataFolders
+        for i in range(data_folders.count):
+            total += count_folder_data_files(data_folders.item(i), True)
+    return total
+
+
+# ── Single file ───────────────────────────────────────────────────────────────
+
+
+def share_data_file(data_file, folder_path: str = "") -> dict:
+    """Turn on sharing for *data_file* and return its result row.
+
+    Errors are reported in the row's `error` column instead of raised, so a
+    single bad file does not stop a batch.
+    """
+    row = dict.fromkeys(SHARE_RESULT_FIELDS, "")
+    row["folder"] = folder_path
+    try:
+        row["name"] = data_file.name
+        row["id"] = data_file.id
+        row["version"] = data_file.versionNumber
+        share_state = data_file.sharedLink
+        row["wasShared"] = share_state.isShared
+        if not row["wasShared"]:
+            share_state.isShared = True
+        row["linkURL"] = share_state.linkURL
+        row["isDownloadAllowed"] = share_state.isDownloadAllowed
+        row["isPasswordRequired"] = share_state.isPasswordRequired
+        if not row["linkURL"]:
+            row["error"] = "No link returned"
+        else:
+            write_share_state_cache(data_file, dict(row, isShared=True))
+    except Exception as e:
+        row["error"] = str(e) or type(e).__name__
+    return row
+
+
+# ── Share-state cache ─────────────────────────────────────────────────────────
+
+
+def share_state_cache_path(data_file) -> str | None:
+    """Return the share-state cache path for *data_file*, or None."""
+    doc_id = getattr(data_file, "id", None)
+    if not doc_id:
+        return None
+    safe_id = re.sub(r"[^\w\-]", "_", doc_id)
+    return os.path.join(CACHE_FOLDER, f"share_state_{safe_id}.json")
+
+
+def read_live_share_state(data_file) -> dict:
+    """Read {isShared, linkURL, isDownloadAllowed, isPasswordRequired} from the cloud."""
+    share_state = data_file.sharedLink
+    return {
+        "isShared": share_state.isShared,
+        "linkURL": share_state.linkURL,
+        "isDownloadAllowed": share_state.isDownloadAllowed,
+        "isPasswordRequired": share_state.isPasswordRequired,
+    }
+
+
+def read_share_state_cache(data_file) -> dict | None:
+    """Return the cached share state for *data_file*'s current version, or None.
+
+    Only the in-memory copy or the cache file is consulted; reading
+    `data_file.id` and `versionNumber` does not go to the cloud.
+    """
+    path = share_state_cache_path(data_file)
+    if path is None:
+        return None
+    payload = _share_states.get(data_file.id)
+    if payload is None and os.path.exists(path):
+        try:
+            with open(path, encoding="utf-8") as fh:
+                payload = json.load(fh)
+        except Exception:
+            futil.log("share state cache: failed to read — ignoring")
+            return None
+        _share_states[data_file.id] = payload
+    if payload is None:
+        return None
+    if payload.get("docId") != data_file.id:
+        return None
+    if payload.get("version") != data_file.versionNumber:
+        return None
+    return {key: payload.get(key) for key in SHARE_STATE_FIELDS}
+
+
+def write_share_state_cache(data_file, state: dict) -> dict:
+    """Persist *state* as the share state of *data_file*'s current version.
+
+    Returns *state* so callers can write-through in one expression.
+    """
+    path = share_state_cache_path(data_file)
+    if path is None:
+        return state
+    payload = {key: state.get(key) for key in SHARE_STATE_FIELDS}
+    payload.update(
+        docId=data_file.id,
+        version=data_file.versionNumber,
+        cachedAt=time.time(),
+    )
+    _share_states[data_file.id] = payload
+    try:
+        os.makedirs(CACHE_FOLDER, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh, indent=2)
+    except Exception:
+        futil.log("share state cache: failed to write — ignoring")
+    return state
+
+
+def invalidate_share_state_cache(data_file) -> None:
+    """Forget the cached share state of *data_file* (all versions)."""
+    doc_id = getattr(data_file, "id", None)
+    if not doc_id:
+        return
+    _share_states.pop(doc_id, None)
+    try:
+        os.remove(share_state_cache_path(data_file))
+    except FileNotFoundError:
+        pass
+    except Exception:
+        futil.log("share state cache: failed to delete — ignoring")
+
+
+def find_open_document(data_file_id: str):
+    """Return the open document saved as *data_file_id*, or None."""
+    for document in app.documents:
+        try:
+            if document.dataFile and document.dataFile.id == data_file_id:
+                return document
+        except Exception:
+            continue
+    return None
+
+
+def schedule_share_state_revalidation(data_file) -> None:
+    """Re-read *data_file*'s live share state once Fusion is idle."""
+    app.fireCustomEvent(SHARE_STATE_REVALIDATE_EVENT_ID, data_file.id)
+
+
+def _revalidate_share_state(args: adsk.core.CustomEventArgs):
+    document = find_open_document(args.additionalInfo)
+    if document is None:
+        return
+    data_file = document.dataFile
+    cached = read_share_state_cache(data_file)
+    with futil.perf_timer("read_live_share_state", "share_state_cache.revalidate"):
+        live = write_share_state_cache(data_file, read_live_share_state(data_file))
+    if cached is None or cached == live:
+        return
+
+    futil.log_lazy(
+        "share state cache: %s changed since last read %s", lambda: data_file.name, live
+    )
+    # The copied link and the download/password notes shown with it all came
+    # from the cache, so any difference is reported.
+    changed = [key for key in SHARE_STATE_FIELDS if cached.get(key) != live.get(key)]
+    if changed:
+        futil.ui.messageBox(
+            f"The share settings of {data_file.name} changed after the link was "
+            f"copied ({', '.join(changed)}). "
+            "Run <b>Get a Share Link</b> again to see the current link and settings.",
+            "Share Document",
+            0,
+            2,
+        )
+
+
+def start_share_state_cache() -> None:
+    """Register the custom event that revalidates cached share states."""
+    register_custom_event(
+        SHARE_STATE_REVALIDATE_EVENT_ID,
+        _revalidate_share_state,
+        name="share_state_cache.revalidate",
+    )
+
+
+def stop_share_state_cache() -> None:
+    """Unregister the revalidation event and drop the in-memory cache."""
+    unregister_custom_event(SHARE_STATE_REVALIDATE_EVENT_ID)
+    _share_states.clear()
+
+
+# ── Deferred share jobs ───────────────────────────────────────────────────────
+
+
+def start_share_job(document, on_complete, cmd_name: str = "") -> str:
+    """Share *document* in idle time and report back through *on_complete*.
+
+    Returns immediately, so the command can show its busy bar and end, but
+    the job itself still blocks: `sharedLink.isShared = True` is a
+    Fusion API call and must run on the UI thread, so Fusion still freezes
+    for as long as the cloud takes to create the link — one idle cycle
+    later than in command_execute. Once sharing is on and the link is on
+    the clipboard, `on_complete(document, share_state, was_shared, error)`
+    runs on the UI thread. `share_state` is the dict from
+    `read_live_share_state` (None on failure) and `error` is an error
+    string or None.
+    """
+    job_id = str(next(_share_job_ids))
+    _share_jobs[job_id] = {
+        "dataFileId": document.dataFile.id,
+        "onComplete": on_complete,
+        "cmdName": cmd_name,
+        "shareState": None,
+        "wasShared": False,
+        "error": None,
+    }
+    app.fireCustomEvent(SHARE_JOB_START_EVENT_ID, job_id)
+    return job_id
+
+
+def _run_share_job(args: adsk.core.CustomEventArgs):
+    """UI thread, when Fusion is idle: turn sharing on and copy the link."""
+    job_id = args.additionalInfo
+    job = _share_jobs.get(job_id)
+    if job is None:
+        return
+    try:
+        document = find_open_document(job["dataFileId"])
+        if document is None:
+            raise RuntimeError("The document was closed before it could be shared.")
+        data_file = document.dataFile
+        with futil.perf_timer("isShared = True", f"{job['cmdName']}.share_job"):
+            share_state = data_file.sharedLink
+            job["wasShared"] = share_state.isShared
+            if not job["wasShared"]:
+                share_state.isShared = True
+            job["shareState"] = write_share_state_cache(
+                data_file, read_live_share_state(data_file)
+            )
+    except Exception as e:
+        job["error"] = str(e) or type(e).__name__
+    else:
+        link = (job["shareState"] or {}).get("linkURL")
+        if link:
+            try:
+                with futil.perf_timer("clipboard copy", f"{job['cmdName']}.share_job"):
+                    futil.copy_to_clipboard(link)
+            except Exception as e:
+                job["error"] = f"Copying the link to the clipboard failed: {e}"
+    _share_job_done(job_id)
+
+
+def _share_job_done(job_id: str):
+    """Deliver the result of a share job to the command."""
+    job = _share_jobs.pop(job_id, None)
+    if job is None:
+        return
+    document = find_open_document(job["dataFileId"])
+    job["onComplete"](document, job["shareState"], job["wasShared"], job["error"])
+
+
+def start_share_jobs() -> None:
+    """Register the custom event that starts share jobs."""
+    register_custom_event(
+        SHARE_JOB_START_EVENT_ID, _run_share_job, name="share_job.start"
+    )
+
+
+def stop_share_jobs() -> None:
+    """Unregister the pipeline event and forget unfinished jobs."""
+    unregister_custom_event(SHARE_JOB_START_EVENT_ID)
+    _share_jobs.clear()
+
+
+# ── Streaming output ──────────────────────────────────────────────────────────
+
+
+class ShareResultWriter:
+    """Append-only CSV or JSON Lines writer chosen from the file extension.
+
+    `.csv` writes CSV with a header row (skipped when appending to an
+    existing file); any other extension writes one JSON object per line.
+    `fieldnames` sets the CSV columns (share results by default).
+
+    `truncate_to` (with `append`) cuts the file back to an `offset()` saved
+    in a checkpoint, dropping rows written after that checkpoint so a
+    resumed run does not write them twice.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        append: bool = False,
+        fieldnames: list = SHARE_RESULT_FIELDS,
+        truncate_to: int = None,
+    ):
+        self.output_path = output_path
+        self.is_csv = output_path.lower().endswith(".csv")
+        write_header = not (append and os.path.exists(output_path))
+        if append and truncate_to is not None and not write_header:
+            with open(output_path, "r+b") as fh:
+                fh.truncate(truncate_to)
+        self._fh = open(
+            output_path, "a" if append else "w", encoding="utf-8", newline=""
+        )
+        self._csv = None
+        if self.is_csv:
+            self._csv = csv.DictWriter(self._fh, fieldnames=fieldnames)
+            if write_header:
+                self._csv.writeheader()
+
+    def write(self, row: dict) -> None:
+        if self._csv is not None:
+            self._csv.writerow(row)
+        else:
+            self._fh.write(json.dumps(row) + "\n")
+
+    def flush(self) -> None:
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+
+    def offset(self) -> int:
+        """Return the size of the output after the last flush()."""
+        return os.fstat(self._fh.fileno()).st_size
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+# ── Checkpoints ───────────────────────────────────────────────────────────────
+
+
+def _folder_key(folder) -> str:
+    raw_key = getattr(folder, "id", None) or folder.name
+    return re.sub(r"[^\w\-]", "_", raw_key)
+
+
+def batch_checkpoint_path(folder, prefix: str = "batch_share") -> str:
+    """Return the JSON checkpoint path for a batch run rooted at *folder*."""
+    return os.path.join(CACHE_FOLDER, f"{prefix}_{_folder_key(folder)}.json")
+
+
+def read_batch_checkpoint(folder, prefix: str = "batch_share") -> dict | None:
+    """Return the checkpoint {outputPath, completed, ...} for *folder*, or None."""
+    path = batch_checkpoint_path(folder, prefix)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as fh:
+            payload = json.load(fh)
+        if payload.get("folderKey") != _folder_key(folder):
+            return None
+        if not payload.get("outputPath"):
+            return None
+        return payload
+    except Exception:
+        futil.log("batch checkpoint: failed to read — ignoring")
+        return None
+
+
+def write_batch_checkpoint(folder, payload: dict, prefix: str = "batch_share") -> None:
+    """Atomically persist *payload* as the checkpoint for *folder*."""
+    path = batch_checkpoint_path(folder, prefix)
+    payload = dict(payload, folderKey=_folder_key(folder), folderName=folder.name)
+    try:
+        os.makedirs(CACHE_FOLDER, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh)
+        os.replace(tmp_path, path)
+    except Exception:
+        futil.log("batch checkpoint: failed to write — ignoring")
+
+
+def clear_batch_checkpoint(folder, prefix: str = "batch_share") -> None:
+    """Delete the checkpoint for *folder* if present."""
+    try:
+        os.remove(batch_checkpoint_path(folder, prefix))
+    except FileNotFoundError:
+        pass
+    except Exception:
+        futil.log("batch checkpoint: failed to delete — ignoring")
+
+
+# ── Batch engine ──────────────────────────────────────────────────────────────
+
+
+def batch_share_folder(
+    folder,
+    output_path: str,
+    *,
+    recursive: bool = True,
+    resume: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: adsk.core.ProgressDialog = None,
+    cmd_name: str = "",
+) -> dict:
+    """Share every data file under *folder* and stream results to *output_path*.
+
+    With `resume`, files recorded in the folder's checkpoint are skipped and
+    rows are appended to the existing output, after dropping any rows
+    written since that checkpoint. The checkpoint is written after each
+    batch and deleted once the whole folder is processed. `progress`,
+    if given, is advanced per file and checked for cancellation per batch.
+
+    Returns {"total", "shared", "alreadyShared", "failed", "skipped",
+    "cancelled", "outputPath"}.
+    """
+    checkpoint = read_batch_checkpoint(folder) if resume else None
+    completed = set(checkpoint.get("completed", [])) if checkpoint else set()
+    if not resume:
+        clear_batch_checkpoint(folder)
+
+    with futil.perf_timer("count_folder_data_files", f"{cmd_name}.batch_share"):
+        total = count_folder_data_files(folder, recursive)
+    summary = {
+        "total": total,
+        "shared": 0,
+        "alreadyShared": 0,
+        "failed": 0,
+        "skipped": len(completed),
+        "cancelled": False,
+        "outputPath": output_path,
+    }
+    if progress is not None:
+        progress.maximumValue = total
+        progress.progressValue = len(completed)
+
+    batch_size = max(1, batch_size)
+    in_batch = 0
+    done = len(completed)
+    writer = ShareResultWriter(
+        output_path,
+        append=bool(completed),
+        truncate_to=checkpoint.get("outputOffset") if checkpoint else None,
+    )
+    try:
+        for folder_path, data_file in iter_folder_data_files(folder, recursive):
+            if data_file.id in completed:
+                continue
+
+            row = share_data_file(data_file, folder_path)
+            writer.write(row)
+            completed.add(data_file.id)
+            if row["error"]:
+                summary["failed"] += 1
+            elif row["wasShared"]:
+                summary["alreadyShared"] += 1
+            else:
+                summary["shared"] += 1
+
+            done += 1
+            in_batch += 1
+            if progress is not None:
+                progress.progressValue = done
+
+            if in_batch >= batch_size:
+                in_batch = 0
+                writer.flush()
+                write_batch_checkpoint(
+                    folder,
+                    {
+                        "outputPath": output_path,
+                        "outputOffset": writer.offset(),
+                        "recursive": recursive,
+                        "completed": sorted(completed),
+                    },
+                )
+                adsk.doEvents()
+                if progress is not None and progress.wasCancelled:
+                    summary["cancelled"] = True
+                    break
+    finally:
+        writer.close()
+
+    if summary["cancelled"]:
+        write_batch_checkpoint(
+            folder,
+            {
+                "outputPath": output_path,
+                "outputOffset": os.path.getsize(output_path),
+                "recursive": recursive,
+                "completed": sorted(completed),
+            },
+        )
+    else:
+        clear_batch_checkpoint(folder)
+
+    futil.log_lazy("%s: batch share finished %s", cmd_name, summary)
+    return summary
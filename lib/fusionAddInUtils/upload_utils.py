@@ -10,7 +10,10 @@ APIs return depending on the call and client build:
   - `DataFileFuture` with `isComplete` / `error` — Document.save (newer builds)
   - `bool` — Document.save (some builds; uses a version-bump fallback)
 
-Pass `log_fn` to surface heartbeat lines in the caller's log.
+Pass `log_fn` to surface heartbeat lines in the caller's log. With
+config.PERF_TRACE on, each wait is a `perf_timer` span under
+"<context_label>.wait_for_upload"; each `adsk.doEvents()` / state poll in
+its loop is a `perf_span` (trace span and histogram, no log line).
 
 Note: `Component.saveCopyAs` from inside a command with CommandInputs needs
 a tight `adsk.doEvents()` spin (no `time.sleep`) to advance Fusion's upload
@@ -21,6 +24,8 @@ is for `Document.save` flows where the standard polling cadence works.
 import time
 import adsk.core
 
+from .general_utils import perf_span, perf_timer
+
 
 DEFAULT_UPLOAD_TIMEOUT_SECONDS = 300
 DEFAULT_POLL_INTERVAL_SECONDS = 0.5
@@ -32,6 +37,10 @@ def _noop_log(_msg):
     pass
 
 
+def _span_context(context_label):
+    return f"{context_label}.wait_for_upload"
+
+
 def wait_for_upload(
     save_result,
     context_label,
@@ -79,16 +88,17 @@ def wait_for_upload(
             msg = f"Save+upload completed for {context_label} (bool, no doc to poll)"
             log(f"[wait_for_upload] {msg}")
             return True, msg
-        return _wait_via_document_state(
-            document,
-            context_label,
-            poll_interval,
-            pre_save_version,
-            timeout_seconds,
-            settle_seconds,
-            log,
-            heartbeat_seconds,
-        )
+        with perf_timer("wait via document state", _span_context(context_label)):
+            return _wait_via_document_state(
+                document,
+                context_label,
+                poll_interval,
+                pre_save_version,
+                timeout_seconds,
+                settle_seconds,
+                log,
+                heartbeat_seconds,
+            )
 
     if hasattr(save_result, "uploadState"):
         try:
@@ -99,25 +109,27 @@ def wait_for_upload(
             f"[wait_for_upload] {context_label}: polling via uploadState "
             f"(initial={initial_state})"
         )
-        return _wait_via_upload_state(
-            save_result,
-            context_label,
-            poll_interval,
-            timeout_seconds,
-            log,
-            heartbeat_seconds,
-        )
+        with perf_timer("wait via uploadState", _span_context(context_label)):
+            return _wait_via_upload_state(
+                save_result,
+                context_label,
+                poll_interval,
+                timeout_seconds,
+                log,
+                heartbeat_seconds,
+            )
 
     if hasattr(save_result, "isComplete"):
         log(f"[wait_for_upload] {context_label}: polling via isComplete")
-        return _wait_via_is_complete(
-            save_result,
-            context_label,
-            poll_interval,
-            timeout_seconds,
-            log,
-            heartbeat_seconds,
-        )
+        with perf_timer("wait via isComplete", _span_context(context_label)):
+            return _wait_via_is_complete(
+                save_result,
+                context_label,
+                poll_interval,
+                timeout_seconds,
+                log,
+                heartbeat_seconds,
+            )
 
     msg = (
         f"Save failed for {context_label}: unsupported save result type "
@@ -133,10 +145,12 @@ def _wait_via_upload_state(
     start = time.monotonic()
     last_heartbeat = start
     last_state = None
+    span_context = _span_context(context_label)
 
     while True:
         try:
-            current_state = future.uploadState
+            with perf_span("read uploadState", span_context):
+                current_state = future.uploadState
         except Exception as e:
             msg = (
                 f"Reading uploadState failed for {context_label}: {e}"
@@ -153,7 +167,8 @@ def _wait_via_upload_state(
             )
             last_state = current_state
 
-        adsk.doEvents()
+        with perf_span("doEvents", span_context):
+            adsk.doEvents()
         now = time.monotonic()
         elapsed = now - start
 
@@ -203,8 +218,10 @@ def _wait_via_is_complete(
 ):
     start = time.monotonic()
     last_heartbeat = start
+    span_context = _span_context(context_label)
     while not future.isComplete:
-        adsk.doEvents()
+        with perf_span("doEvents", span_context):
+            adsk.doEvents()
         now = time.monotonic()
         elapsed = now - start
         if heartbeat_seconds > 0 and (now - last_heartbeat) >= heartbeat_seconds:
@@ -244,6 +261,7 @@ def _wait_via_document_state(
     last_heartbeat = start
     stable_since = None
     stable_ready_checks = 0
+    span_context = _span_context(context_label)
 
     data_file_id = None
     try:
@@ -253,20 +271,22 @@ def _wait_via_document_state(
         data_file_id = None
 
     while True:
-        adsk.doEvents()
+        with perf_span("doEvents", span_context):
+            adsk.doEvents()
 
         current_version = None
         try:
-            if data_file_id:
-                refreshed = app.data.findFileById(data_file_id)
-                if refreshed and hasattr(refreshed, "versionNumber"):
-                    current_version = refreshed.versionNumber
-            if (
-                current_version is None
-                and document.dataFile
-                and hasattr(document.dataFile, "versionNumber")
-            ):
-                current_version = document.dataFile.versionNumber
+            with perf_span("poll version", span_context):
+                if data_file_id:
+                    refreshed = app.data.findFileById(data_file_id)
+                    if refreshed and hasattr(refreshed, "versionNumber"):
+                        current_version = refreshed.versionNumber
+                if (
+                    current_version is None
+                    and document.dataFile
+                    and hasattr(document.dataFile, "versionNumber")
+                ):
+                    current_version = document.dataFile.versionNumber
         except Exception:
             current_version = None
 
@@ -0,0 +1,208 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2022-2026 IMA LLC
+
+"""Main-thread stall watchdog with stack sampling.
+
+Long synchronous Fusion API calls inside a handler (`isShared = True`,
+`app.data.findFileById` while waiting for an upload) freeze the UI without
+leaving a trace. After `start_stall_watchdog()`, every handler created by
+`event_utils.add_handler()` marks its entry and exit on the UI thread. A
+daemon thread checks the outermost running handler; once it has run longer
+than the threshold, the thread samples the UI thread's stack through
+`sys._current_frames()` until the handler returns.
+
+Stall files (written under add-in/cache/stalls/):
+  stalls_<session>.folded — collapsed stacks ("frame;frame;... count"),
+                            rooted at the stalled handler, for flamegraph.pl,
+                            speedscope or Perfetto
+  stalls_<session>.jsonl  — one {"command", "handler", "start", "duration",
+                            "samples"} record per stall
+
+Both files are written by the watchdog thread after a stall ends or the
+watchdog is stopped, never by the UI thread.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+from .cache_utils import CACHE_FOLDER
+
+STALL_FOLDER = os.path.join(CACHE_FOLDER, "stalls")
+
+DEFAULT_STALL_THRESHOLD_SECONDS = 0.5
+DEFAULT_SAMPLE_INTERVAL_SECONDS = 0.01
+
+# Frames deeper than this are cut off at the root end of the stack.
+MAX_STACK_DEPTH = 128
+
+_watchdog = None
+
+
+class StallWatchdog:
+    """Samples the watched thread's stack while a handler overruns."""
+
+    def __init__(
+        self,
+        threshold_seconds: float = DEFAULT_STALL_THRESHOLD_SECONDS,
+        sample_interval: float = DEFAULT_SAMPLE_INTERVAL_SECONDS,
+        folder: str = STALL_FOLDER,
+    ):
+        self.threshold_seconds = threshold_seconds
+        self.sample_interval = sample_interval
+        self.main_thread_id = threading.get_ident()
+
+        session = time.strftime("%Y%m%d-%H%M%S")
+        self.folded_path = os.path.join(folder, f"stalls_{session}.folded")
+        self.events_path = os.path.join(folder, f"stalls_{session}.jsonl")
+
+        # [(label, monotonic start)], only mutated on the watched thread.
+        self.handlers = []
+        # {collapsed stack: sample count} for the whole session.
+        self.folded = {}
+        self.stall_count = 0
+
+        self._stall = None
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="PTSHD-stall-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    # ── Called on the watched thread ─────────────────────────────────────────
+
+    def enter(self, label: str):
+        entry = (label, time.monotonic())
+        self.handlers.append(entry)
+        return entry
+
+    def exit(self, entry) -> None:
+        if self.handlers and self.handlers[-1] is entry:
+            self.handlers.pop()
+        elif entry in self.handlers:
+            self.handlers.remove(entry)
+
+    # ── Watchdog thread ──────────────────────────────────────────────────────
+
+    def _collapse(self, frame, root: str) -> str:
+        names = []
+        while frame is not None and len(names) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            module = os.path.splitext(os.path.basename(code.co_filename))[0]
+            names.append(f"{module}:{code.co_name}")
+            frame = frame.f_back
+        names.append(root)
+        return ";".join(reversed(names))
+
+    def _sample(self, outer, inner) -> None:
+        frame = sys._current_frames().get(self.main_thread_id)
+        if frame is None:
+            return
+        stack = self._collapse(frame, outer[0])
+        self.folded[stack] = self.folded.get(stack, 0) + 1
+        self._stall["samples"] += 1
+        self._stall["handler"] = inner[0]
+
+    def _finish_stall(self) -> None:
+        stall, self._stall = self._stall, None
+        del stall["key"]
+        stall["duration"] = round(time.monotonic() - stall.pop("startedAt"), 3)
+        self.stall_count += 1
+        try:
+            os.makedirs(os.path.dirname(self.events_path), exist_ok=True)
+            with open(self.events_path, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(stall) + "\n")
+            self.write_folded()
+        except Exception:
+            # Diagnostics must never take the add-in down.
+            pass
+
+    def write_folded(self) -> str | None:
+        """Write the session's collapsed stacks. Returns the path, or None if empty."""
+        if not self.folded:
+            return None
+        tmp_path = f"{self.folded_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            for stack, count in sorted(self.folded.items()):
+                fh.write(f"{stack} {count}\n")
+        os.replace(tmp_path, self.folded_path)
+        return self.folded_path
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.sample_interval):
+            try:
+                handlers = list(self.handlers)
+                outer = handlers[0] if handlers else None
+                if self._stall is not None and self._stall["key"] is not outer:
+                    self._finish_stall()
+                if outer is None:
+                    continue
+                if time.monotonic() - outer[1] < self.threshold_seconds:
+                    continue
+                if self._stall is None:
+                    self._stall = {
+                        "key": outer,
+                        "command": outer[0],
+                        "handler": outer[0],
+                        "start": round(time.time() - (time.monotonic() - outer[1]), 3),
+                        "startedAt": outer[1],
+                        "samples": 0,
+                    }
+                self._sample(outer, handlers[-1])
+            except Exception:
+                pass
+        # A stall still in progress at close() is written here, so the files
+        # only ever have one writer.
+        if self._stall is not None:
+            self._finish_stall()
+
+    def close(self) -> None:
+        """Stop sampling; the watchdog thread writes any stall still in progress."""
+        self._stopping.set()
+        self._thread.join(timeout=2)
+
+
+# ── Handler hooks (used by event_utils) ───────────────────────────────────────
+
+
+def begin_handler_watch(label: str):
+    """Mark a handler as running. Returns a token for end_handler_watch().
+
+    Returns None without doing anything when the watchdog is off or the
+    caller is not the watched (UI) thread.
+    """
+    watchdog = _watchdog
+    if watchdog is None or threading.get_ident() != watchdog.main_thread_id:
+        return None
+    return watchdog.enter(label)
+
+
+def end_handler_watch(token) -> None:
+    """Mark the handler from begin_handler_watch() as finished."""
+    watchdog = _watchdog
+    if token is not None and watchdog is not None:
+        watchdog.exit(token)
+
+
+# ── Lifecycle ─────────────────────────────────────────────────────────────────
+
+
+def start_stall_watchdog(
+    threshold_seconds: float = DEFAULT_STALL_THRESHOLD_SECONDS,
+    sample_interval: float = DEFAULT_SAMPLE_INTERVAL_SECONDS,
+) -> StallWatchdog:
+    """Watch handlers on the calling (UI) thread for stalls."""
+    global _watchdog
+    stop_stall_watchdog()
+    _watchdog = StallWatchdog(threshold_seconds, sample_interval)
+    return _watchdog
+
+
+def stop_stall_watchdog() -> None:
+    """Stop the watchdog, writing a stall that is still in progress."""
+    global _watchdog
+    watchdog, _watchdog = _watchdog, None
+    if watchdog is not None:
+        watchdog.close()